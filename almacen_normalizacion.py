@@ -0,0 +1,118 @@
+"""
+Almacén persistente de direcciones normalizadas (SQLite).
+
+Guarda en disco la dirección de entrada (con la misma clave que la cache en
+memoria) y su resultado, para que una nueva ejecución solo normalice las
+direcciones nuevas o cambiadas. El almacén lleva la versión de las reglas con
+que se calcularon los resultados: si la versión cambia, se vacía al abrirlo.
+"""
+import sqlite3
+
+from cache_normalizacion import clave_cache
+
+# Máximo de parámetros por consulta (límite seguro en todas las versiones de SQLite)
+_PARAMETROS_CONSULTA = 500
+
+
+class AlmacenNormalizacion:
+    """
+    Almacén clave -> dirección normalizada en un archivo SQLite.
+
+    ``version`` identifica el conjunto de reglas; al abrir un almacén creado con
+    otra versión se descartan todos sus resultados (``invalidado`` queda en True).
+    """
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.aciertos = 0
+        self.nuevas = 0
+        self.invalidado = False
+        self._conexion = sqlite3.connect(path)
+        with self._conexion:
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)"
+            )
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS normalizaciones "
+                "(clave TEXT PRIMARY KEY, resultado TEXT NOT NULL) WITHOUT ROWID"
+            )
+            fila = self._conexion.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+            if fila is None or fila[0] != version:
+                self.invalidado = fila is not None
+                self._conexion.execute("DELETE FROM normalizaciones")
+                self._conexion.execute(
+                    "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('version', ?)", (version,)
+                )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self._conexion.execute("SELECT COUNT(*) FROM normalizaciones").fetchone()[0]
+
+    def buscar(self, claves) -> dict:
+        """
+        Retorna {clave: resultado} para las claves que ya están en el almacén.
+        """
+        claves = list(claves)
+        encontrados = {}
+        for i in range(0, len(claves), _PARAMETROS_CONSULTA):
+            parte = claves[i:i + _PARAMETROS_CONSULTA]
+            marcadores = ', '.join('?' * len(parte))
+            encontrados.update(self._conexion.execute(
+                f"SELECT clave, resultado FROM normalizaciones WHERE clave IN ({marcadores})", parte
+            ))
+        return encontrados
+
+    def guardar(self, resultados: dict):
+        with self._conexion:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO normalizaciones (clave, resultado) VALUES (?, ?)",
+                resultados.items(),
+            )
+
+    def descartar(self, claves):
+        """
+        Quita del almacén los resultados de las claves dadas.
+        """
+        with self._conexion:
+            self._conexion.executemany(
+                "DELETE FROM normalizaciones WHERE clave = ?", ((clave,) for clave in claves)
+            )
+
+    def normalizar_lote(self, addresses, procesar) -> list:
+        """
+        Normaliza una secuencia de direcciones usando los resultados guardados.
+        ``procesar`` recibe la lista de direcciones que no están en el almacén
+        (sin repetidas) y retorna sus resultados en el mismo orden; esos
+        resultados se agregan al almacén.
+        """
+        addresses = list(addresses)
+        claves = [clave_cache(address) for address in addresses]
+        guardados = self.buscar({clave for clave in claves if clave is not None})
+        pendientes = {}
+        for clave, address in zip(claves, addresses):
+            if clave not in guardados and clave not in pendientes:
+                pendientes[clave] = address
+
+        nuevos = {}
+        if pendientes:
+            nuevos = dict(zip(pendientes, procesar(list(pendientes.values()))))
+            self.guardar({clave: resultado for clave, resultado in nuevos.items() if clave is not None})
+        self.nuevas += len(nuevos)
+        self.aciertos += len(addresses) - len(nuevos)
+        return [guardados[clave] if clave in guardados else nuevos[clave] for clave in claves]
+
+    def resumen(self) -> str:
+        estado = " (invalidado por cambio de reglas)" if self.invalidado else ""
+        return (
+            f"Almacén {self.path}{estado}: {self.aciertos} reutilizadas, "
+            f"{self.nuevas} normalizadas y guardadas"
+        )
+
+    def cerrar(self):
+        self._conexion.close()
@@ -0,0 +1,389 @@
+"""
+Benchmark y verificación de salida del normalizador.
+
+Tres comandos:
+
+- ``verificar``: normaliza la columna ``Direccion`` del archivo de referencia
+  (por defecto ``Nits_ciudad_normalizadas.xlsx``) en modo serial, con cache, en
+  paralelo y con ``standardize_dataframe``, y compara contra su columna
+  ``Direccion Estandarizada``, y revisa la agrupación de duplicados con casos
+  conocidos (``CASOS_GRUPOS``). Termina con código 1 si alguna dirección o
+  algún grupo cambia.
+- ``medir``: mide direcciones por segundo, latencia por dirección (p50/p99) y
+  memoria máxima en modo serial, con cache, paralelo y dataframe, sobre el
+  archivo de entrada y sobre corpus sintéticos de N veces su tamaño.
+- ``estres``: mide la latencia por dirección con entradas patológicas (palabras
+  repetidas, series de dígitos, notas pegadas) de varias longitudes y con un
+  fuzz de direcciones reales mutadas, sin límites y en modo blindado. Termina
+  con código 1 si en modo blindado alguna dirección supera el presupuesto de
+  tiempo más la resolución de la alarma.
+
+Cada medición corre en un proceso nuevo para que la memoria máxima de una no
+contamine la siguiente.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+import reglas_normalizacion as reglas
+from cache_normalizacion import CacheNormalizacion
+from duplicados_normalizacion import agrupar
+from limites_normalizacion import LONGITUD_MAXIMA, PRESUPUESTO_MS, LimitesNormalizacion
+from normalizar_direcciones import TAMANO_LOTE, standardize_address, standardize_batch, standardize_dataframe
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODOS = ('serial', 'cache', 'paralelo', 'dataframe')
+COMPLEMENTOS_SINTETICOS = ('LOCAL 2', 'OFICINA 301', 'BODEGA 5', 'PISO 3', 'APTO 502', 'CASA 12')
+NUMERO = re.compile(r'\d+')
+LONGITUDES_ESTRES = (256, 1024, 4096)
+# La alarma del modo blindado se revisa con la resolución del temporizador del
+# sistema y cada cierto número de pasos de la expresión regular
+TOLERANCIA_ALARMA_MS = 10.0
+
+# Direcciones normalizadas y los grupos que debe darles agrupar()
+CASOS_GRUPOS = (
+    # Cuadrantes opuestos: OESTE no es ESTE
+    (['CL 5 OESTE 10 20', 'CL 5 ESTE 10 20', 'CL 5 10 20'], [1, 2, 3]),
+    # Cuadrante pegado al número, letras, BIS, ceros y complementos
+    (['CL 12SUR 4 5', 'CL 12 SUR 4 05 201', 'CL 12A 4 5'], [1, 1, 2]),
+    (['CL 127BBIS 21 02 201', 'CL 127B 21 2 202'], [1, 1]),
+    # Sin número de casa: se une a la única casa del bloque con esa vía que cruza
+    (['KR 7 45 10', 'KR 7 45'], [1, 1]),
+    (['KR 7 45 10', 'KR 7 45 12', 'KR 7 45'], [1, 2, 3]),
+    # Sin placa: solo el texto idéntico
+    (['AUTOPISTA NORTE KM 5', 'AUTOPISTA  NORTE KM 5', ''], [1, 1, None]),
+)
+
+
+def cargar_direcciones(path: str, column_name: str = "Direccion") -> list:
+    df = pd.read_excel(path)
+    if column_name not in df.columns:
+        raise ValueError(f"La columna '{column_name}' no existe en el archivo: {path}")
+    return df[column_name].tolist()
+
+
+def corpus_sintetico(direcciones: list, escala: int, semilla: int = 0) -> list:
+    """
+    Retorna ``escala`` copias de las direcciones. La primera copia es el original;
+    en las demás, la mitad de las direcciones se varía (números desplazados,
+    espacios extra o complementos), de modo que el corpus mezcla repetidas y
+    nuevas como una exportación real.
+    """
+    rnd = random.Random(semilla)
+    corpus = list(direcciones)
+    for _ in range(escala - 1):
+        for address in direcciones:
+            if not isinstance(address, str) or rnd.random() < 0.5:
+                corpus.append(address)
+                continue
+            variacion = rnd.randrange(3)
+            if variacion == 0:
+                desplazamiento = rnd.randint(1, 9)
+                address = NUMERO.sub(lambda m: str(int(m.group()) + desplazamiento), address)
+            elif variacion == 1:
+                address = address.replace(' ', '  ', 1)
+            else:
+                address = f"{address} {rnd.choice(COMPLEMENTOS_SINTETICOS)}"
+            corpus.append(address)
+    return corpus
+
+
+def _memoria_maxima_mb():
+    """
+    Memoria residente máxima (MB) de este proceso y de sus procesos hijos.
+    """
+    if resource is None:
+        return None
+    maxima = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return maxima / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _medir(input_file: str, escala: int, modo: str, workers: int, chunk_size: int) -> dict:
+    """
+    Mide un modo sobre un corpus. Se ejecuta en un proceso aparte.
+    """
+    corpus = corpus_sintetico(cargar_direcciones(input_file), escala)
+    latencias = []
+    resultado = {'escala': escala, 'modo': modo, 'filas': len(corpus)}
+
+    if modo == 'paralelo':
+        inicio = time.perf_counter()
+        standardize_batch(corpus, workers, chunk_size)
+        total = time.perf_counter() - inicio
+    elif modo == 'dataframe':
+        df = pd.DataFrame({'Direccion': corpus})
+        inicio = time.perf_counter()
+        standardize_dataframe(df)
+        total = time.perf_counter() - inicio
+    else:
+        normalizar = standardize_address
+        if modo == 'cache':
+            cache = CacheNormalizacion(standardize_address)
+            normalizar = cache.normalizar
+        reloj = time.perf_counter
+        inicio = reloj()
+        for address in corpus:
+            t = reloj()
+            normalizar(address)
+            latencias.append(reloj() - t)
+        total = reloj() - inicio
+        if modo == 'cache':
+            resultado['aciertos_cache'] = round(cache.tasa_aciertos, 4)
+
+    resultado['segundos'] = round(total, 3)
+    resultado['filas_por_segundo'] = round(len(corpus) / total) if total else None
+    # En paralelo y dataframe no hay latencia por dirección: se procesan por lotes
+    resultado['p50_us'] = round(_percentil(latencias, 0.50) * 1e6, 1) if latencias else None
+    resultado['p99_us'] = round(_percentil(latencias, 0.99) * 1e6, 1) if latencias else None
+    memoria = _memoria_maxima_mb()
+    resultado['memoria_max_mb'] = round(memoria, 1) if memoria is not None else None
+    return resultado
+
+
+def medir(input_file: str, escalas, modos, workers: int = 0, chunk_size: int = TAMANO_LOTE) -> list:
+    resultados = []
+    for escala in escalas:
+        for modo in modos:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                resultado = executor.submit(_medir, input_file, escala, modo, workers, chunk_size).result()
+            resultados.append(resultado)
+            print(_formatear(resultado), flush=True)
+    return resultados
+
+
+def _formatear(r: dict) -> str:
+    def valor(clave, ancho):
+        return format(r[clave] if r.get(clave) is not None else '-', f'>{ancho}')
+
+    linea = (
+        f"x{r['escala']:<3} {r['modo']:<9} {r['filas']:>9} filas  "
+        f"{valor('filas_por_segundo', 8)} filas/s  "
+        f"p50 {valor('p50_us', 7)} us  p99 {valor('p99_us', 7)} us  "
+        f"memoria {valor('memoria_max_mb', 7)} MB"
+    )
+    if 'aciertos_cache' in r:
+        linea += f"  aciertos {r['aciertos_cache']*100:.1f}%"
+    return linea
+
+
+def _repetir(patron: str, longitud: int) -> str:
+    return (patron * (longitud // len(patron) + 1))[:longitud].strip()
+
+
+def patologicas(direcciones: list, longitud: int, semilla: int = 0) -> dict:
+    """
+    Entradas patológicas de unos ``longitud`` caracteres, por nombre: las formas
+    que más castigan a las expresiones regulares (palabras repetidas, series de
+    dígitos o espacios) y texto libre armado con palabras reales.
+    """
+    rnd = random.Random(semilla)
+    reales = [address for address in direcciones if isinstance(address, str)]
+    palabras = sorted({palabra for address in reales for palabra in address.split()})
+    nota = []
+    while sum(len(palabra) + 1 for palabra in nota) < longitud:
+        nota.append(rnd.choice(palabras))
+    concatenadas = []
+    while sum(len(address) + 1 for address in concatenadas) < longitud:
+        concatenadas.append(rnd.choice(reales))
+    return {
+        'km_repetido': _repetir('KM 1 ', longitud),
+        'digitos_autopista': 'AUTOPISTA NORTE ' + '1' * longitud,
+        'via_con_nombre': _repetir('CL LA ', longitud),
+        'numeros': _repetir('1 ', longitud),
+        'espacios': 'CL' + ' ' * longitud + '1',
+        'simbolos': _repetir('1-#.', longitud),
+        'coordenadas': _repetir('4.123456 N ', longitud),
+        'nota_pegada': ' '.join(nota),
+        'concatenadas': ' '.join(concatenadas),
+    }
+
+
+def fuzz(direcciones: list, filas: int, semilla: int = 0) -> list:
+    """
+    Direcciones reales mutadas: palabras repetidas, direcciones unidas, trozos
+    duplicados y palabras de otras direcciones insertadas.
+    """
+    rnd = random.Random(semilla)
+    reales = [address for address in direcciones if isinstance(address, str) and address.split()]
+    palabras = sorted({palabra for address in reales for palabra in address.split()})
+    corpus = []
+    for _ in range(filas):
+        tokens = rnd.choice(reales).split()
+        for _ in range(rnd.randint(1, 4)):
+            mutacion = rnd.randrange(4)
+            posicion = rnd.randrange(len(tokens) + 1)
+            if mutacion == 0 and tokens:
+                tokens[posicion:posicion] = [rnd.choice(tokens)] * rnd.randint(2, 60)
+            elif mutacion == 1:
+                tokens += rnd.choice(reales).split()
+            elif mutacion == 2:
+                tokens = tokens[:posicion] * rnd.randint(2, 8) + tokens[posicion:]
+            else:
+                tokens[posicion:posicion] = rnd.choices(palabras, k=rnd.randint(1, 20))
+        corpus.append(' '.join(tokens))
+    return corpus
+
+
+def _latencia_ms(normalizar, address) -> float:
+    inicio = time.perf_counter()
+    normalizar(address)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def estres(input_file: str, longitudes=LONGITUDES_ESTRES, filas: int = 5000,
+           longitud_maxima: int = LONGITUD_MAXIMA, presupuesto_ms: float = PRESUPUESTO_MS) -> dict:
+    """
+    Latencia por dirección (ms) de las entradas patológicas y del fuzz, sin
+    límites y en modo blindado. Retorna el peor caso de cada modo.
+    """
+    direcciones = cargar_direcciones(input_file)
+    limites = LimitesNormalizacion(longitud_maxima, presupuesto_ms)
+    modos = {
+        'sin_limites': standardize_address,
+        'blindado': lambda address: limites.normalizar_lote([address], standardize_address, lambda motivo: ''),
+    }
+    reglas.precargar()
+    peor = dict.fromkeys(modos, 0.0)
+
+    print(f"{'entrada':<18} {'longitud':>8}  " + '  '.join(f"{modo:>12}" for modo in modos))
+    for longitud in longitudes:
+        for nombre, address in patologicas(direcciones, longitud).items():
+            latencias = {modo: _latencia_ms(normalizar, address) for modo, normalizar in modos.items()}
+            for modo, latencia in latencias.items():
+                peor[modo] = max(peor[modo], latencia)
+            print(f"{nombre:<18} {len(address):>8}  " +
+                  '  '.join(f"{latencias[modo]:>9.2f} ms" for modo in modos), flush=True)
+
+    corpus = fuzz(direcciones, filas)
+    for modo, normalizar in modos.items():
+        latencias = [_latencia_ms(normalizar, address) for address in corpus]
+        peor[modo] = max(peor[modo], max(latencias))
+        print(f"fuzz {modo}: {len(corpus)} direcciones (hasta {max(map(len, corpus))} caracteres)  "
+              f"p50 {_percentil(latencias, 0.50):.3f} ms  p99 {_percentil(latencias, 0.99):.3f} ms  "
+              f"máximo {max(latencias):.2f} ms")
+    motivos = Counter(motivo for motivo, _, _ in limites.excedidas.values())
+    print(f"Modo blindado: {len(limites.excedidas)} direcciones excedidas "
+          f"({', '.join(f'{motivo} {cantidad}' for motivo, cantidad in motivos.most_common()) or '-'})")
+    return peor
+
+
+def verificar(reference_file: str, workers: int = 2, mostrar: int = 20) -> int:
+    """
+    Compara la normalización actual contra el archivo de referencia en los
+    modos serial, con cache, paralelo y dataframe (camino vectorizado).
+    Retorna el número de diferencias.
+    """
+    referencia = pd.read_excel(reference_file)
+    direcciones = referencia["Direccion"].tolist()
+    # pandas lee las celdas vacías como NaN
+    esperadas = referencia["Direccion Estandarizada"].fillna('').astype(str).tolist()
+
+    salidas = {
+        'serial': standardize_batch(direcciones),
+        'cache': standardize_batch(direcciones, cache=CacheNormalizacion(standardize_address)),
+        'paralelo': standardize_batch(direcciones, workers),
+        'dataframe': standardize_dataframe(referencia[["Direccion"]].copy())["Direccion Estandarizada"].tolist(),
+    }
+    diferencias = 0
+    for modo, salida in salidas.items():
+        distintas = [i for i, (a, b) in enumerate(zip(salida, esperadas)) if a != b]
+        diferencias += len(distintas)
+        print(f"{modo}: {len(distintas)} diferencias en {len(esperadas)} direcciones")
+        for i in distintas[:mostrar]:
+            print(f"  fila {i + 2}: {direcciones[i]!r} -> {salida[i]!r} (esperado {esperadas[i]!r})")
+    return diferencias
+
+
+def verificar_grupos() -> int:
+    """
+    Revisa agrupar() con ``CASOS_GRUPOS``. Retorna el número de casos distintos.
+    """
+    diferencias = 0
+    for direcciones, esperados in CASOS_GRUPOS:
+        grupos = agrupar(direcciones)
+        if grupos != esperados:
+            diferencias += 1
+            print(f"  grupos de {direcciones!r}: {grupos} (esperado {esperados})")
+    print(f"grupos: {diferencias} diferencias en {len(CASOS_GRUPOS)} casos")
+    return diferencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark y verificación de salida del normalizador")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    verificacion = comandos.add_parser("verificar", help="comparar contra la salida de referencia")
+    verificacion.add_argument("-r", "--reference", default="Nits_ciudad_normalizadas.xlsx",
+                              help="archivo de referencia (por defecto Nits_ciudad_normalizadas.xlsx)")
+    verificacion.add_argument("-j", "--workers", type=int, default=2,
+                              help="procesos para el modo paralelo (por defecto 2)")
+
+    medicion = comandos.add_parser("medir", help="medir velocidad, latencia y memoria")
+    medicion.add_argument("-i", "--input", default="Nits_ciudad.xlsx",
+                          help="archivo de entrada (por defecto Nits_ciudad.xlsx)")
+    medicion.add_argument("--scales", type=int, nargs="+", default=[1, 5],
+                          help="tamaños del corpus en múltiplos de la entrada (por defecto 1 5)")
+    medicion.add_argument("--modes", nargs="+", choices=MODOS, default=list(MODOS),
+                          help="modos a medir (por defecto todos)")
+    medicion.add_argument("-j", "--workers", type=int, default=0,
+                          help="procesos del modo paralelo (0 = todos los núcleos, por defecto 0)")
+    medicion.add_argument("--chunk-size", type=int, default=TAMANO_LOTE,
+                          help=f"direcciones por lote en modo paralelo (por defecto {TAMANO_LOTE})")
+    medicion.add_argument("--json", help="guardar los resultados en este archivo JSON")
+
+    estresamiento = comandos.add_parser("estres", help="latencia del peor caso con entradas patológicas")
+    estresamiento.add_argument("-i", "--input", default="Nits_ciudad.xlsx",
+                               help="archivo con direcciones reales para armar las entradas (por defecto Nits_ciudad.xlsx)")
+    estresamiento.add_argument("--lengths", type=int, nargs="+", default=list(LONGITUDES_ESTRES),
+                               help="longitudes de las entradas patológicas (por defecto 256 1024 4096)")
+    estresamiento.add_argument("--rows", type=int, default=5000,
+                               help="direcciones del fuzz (por defecto 5000)")
+    estresamiento.add_argument("--max-length", type=int, default=LONGITUD_MAXIMA,
+                               help=f"longitud máxima del modo blindado (por defecto {LONGITUD_MAXIMA})")
+    estresamiento.add_argument("--row-budget-ms", type=float, default=PRESUPUESTO_MS,
+                               help=f"presupuesto por dirección del modo blindado (por defecto {PRESUPUESTO_MS:g})")
+    args = parser.parse_args(argv)
+    if args.comando == "estres" and (args.max_length < 1 or args.row_budget_ms <= 0):
+        parser.error("--max-length debe ser al menos 1 y --row-budget-ms mayor que 0")
+
+    if args.comando == "verificar":
+        diferencias = verificar(args.reference, args.workers) + verificar_grupos()
+        print("OK: salida idéntica a la referencia" if not diferencias else f"FALLO: {diferencias} diferencias")
+        return 1 if diferencias else 0
+
+    if args.comando == "estres":
+        peor = estres(args.input, args.lengths, args.rows, args.max_length, args.row_budget_ms)
+        limite = args.row_budget_ms + TOLERANCIA_ALARMA_MS
+        print(f"Peor caso: sin límites {peor['sin_limites']:.2f} ms, blindado {peor['blindado']:.2f} ms "
+              f"(límite {limite:g} ms)")
+        return 1 if peor['blindado'] > limite else 0
+
+    resultados = medir(args.input, args.scales, args.modes, args.workers, args.chunk_size)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Cache de normalización para direcciones repetidas.
+
+Las exportaciones de clientes repiten mucho las mismas direcciones (sedes,
+locales de aeropuerto, direcciones de VIA). El resultado de
+``standardize_address`` solo depende del texto sin espacios en los extremos y en
+mayúsculas, así que ese texto se usa como clave y cada dirección distinta se
+normaliza una sola vez.
+"""
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+TAMANO_CACHE = 100000
+
+
+def clave_cache(address):
+    """
+    Clave de cache de una dirección: el texto ya limpiado por standardize_address.
+    """
+    if pd.isna(address):
+        return None
+    return str(address).strip().upper()
+
+
+class CacheNormalizacion:
+    """
+    Cache LRU acotada alrededor de una función de normalización.
+
+    ``funcion`` normaliza una dirección; ``tamano_maximo`` es el número máximo de
+    entradas (al superarlo se desaloja la usada hace más tiempo). Lleva la
+    cuenta de aciertos, fallos y desalojos, y estima el tiempo ahorrado a partir
+    del costo medio de cada fallo.
+    """
+
+    def __init__(self, funcion, tamano_maximo: int = TAMANO_CACHE):
+        if tamano_maximo < 1:
+            raise ValueError("El tamaño de la cache debe ser al menos 1.")
+        self.funcion = funcion
+        self.tamano_maximo = tamano_maximo
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self._tiempo_fallos = 0.0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _guardar(self, clave, resultado: str):
+        self._entradas[clave] = resultado
+        if len(self._entradas) > self.tamano_maximo:
+            self._entradas.popitem(last=False)
+            self.desalojos += 1
+
+    def normalizar(self, address) -> str:
+        """
+        Normaliza una dirección, usando el resultado guardado si ya se vio.
+        """
+        clave = clave_cache(address)
+        resultado = self._entradas.get(clave)
+        if resultado is not None:
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+        inicio = time.perf_counter()
+        resultado = self.funcion(address)
+        self._tiempo_fallos += time.perf_counter() - inicio
+        self.fallos += 1
+        self._guardar(clave, resultado)
+        return resultado
+
+    def normalizar_lote(self, addresses, procesar) -> list:
+        """
+        Normaliza una secuencia de direcciones procesando cada valor distinto una
+        sola vez. ``procesar`` recibe la lista de direcciones que no están en la
+        cache (sin repetidas) y retorna sus resultados en el mismo orden.
+        """
+        addresses = list(addresses)
+        claves = [clave_cache(address) for address in addresses]
+        pendientes = {}
+        for clave, address in zip(claves, addresses):
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+            elif clave not in pendientes:
+                pendientes[clave] = address
+
+        nuevos = {}
+        if pendientes:
+            inicio = time.perf_counter()
+            nuevos = dict(zip(pendientes, procesar(list(pendientes.values()))))
+            self._tiempo_fallos += time.perf_counter() - inicio
+        self.fallos += len(nuevos)
+        self.aciertos += len(addresses) - len(nuevos)
+
+        # Resolver el lote antes de guardar, por si guardar desaloja claves del lote
+        resultados = [nuevos[clave] if clave in nuevos else self._entradas[clave] for clave in claves]
+        for clave, resultado in nuevos.items():
+            self._guardar(clave, resultado)
+        return resultados
+
+    @property
+    def tasa_aciertos(self) -> float:
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    @property
+    def tiempo_ahorrado(self) -> float:
+        """
+        Segundos ahorrados estimados: aciertos por costo medio de un fallo.
+        """
+        if not self.fallos:
+            return 0.0
+        return self.aciertos * self._tiempo_fallos / self.fallos
+
+    def resumen(self) -> str:
+        return (
+            f"Cache: {self.aciertos} aciertos, {self.fallos} fallos "
+            f"({self.tasa_aciertos*100:.1f}% aciertos), {self.desalojos} desalojos, "
+            f"~{self.tiempo_ahorrado:.2f}s ahorrados"
+        )
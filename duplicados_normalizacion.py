@@ -0,0 +1,134 @@
+"""
+Agrupación de direcciones normalizadas que son la misma dirección física.
+
+Trabaja sobre la salida de ``standardize_address`` en tiempo lineal, sin
+comparar todas las direcciones contra todas:
+
+- Bloqueo: las direcciones ``TIPO NUM ...`` se agrupan por tipo de vía, número
+  de la vía principal y cuadrante (SUR, ESTE, OESTE).
+- Dentro del bloque, la placa (número de la vía que cruza y número de la casa)
+  decide el grupo. Se ignoran las letras y el BIS pegados a los números (72A,
+  6ABIS, 35N), los ceros a la izquierda y los números después de la placa
+  (apartamento, oficina, local), de modo que ``CL 127BBIS 21 02 201`` y
+  ``CL 127B 21 2 202`` quedan en el mismo grupo.
+- Un índice invertido (bloque, vía que cruza) -> números de casa permite unir
+  las direcciones sin número de casa cuando en el bloque hay una sola casa con
+  esa vía que cruza.
+- Las demás direcciones (AUTOPISTA, AEROPUERTO, KM, solo números, o sin vía que
+  cruza) se agrupan solo si el texto es idéntico.
+"""
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+import reglas_normalizacion as reglas
+
+COLUMNA_GRUPO = "Grupo Direccion"
+COLUMNA_TAMANO = "Filas en Grupo"
+COLUMNA_IDENTIFICACIONES = "Identificaciones en Grupo"
+
+_NUMERO = re.compile(r'0*(\d+)')
+# Cuadrante como palabra completa o pegado a un número (12SUR, 64ABISSUR); OESTE
+# va antes que ESTE y el prefijo es perezoso para no leer 12OESTE como ESTE
+_CUADRANTE = re.compile(r'(?:\d+[A-Z]*?)?(SUR|OESTE|ESTE)')
+
+
+@lru_cache(maxsize=None)
+def _tipos_via() -> frozenset:
+    # Se calcula al primer uso: importar el módulo no carga las tablas de reglas
+    return frozenset(reglas.TIPOS_VIA) | frozenset(reglas.TIPOS_VIA.values())
+
+
+def componentes(normalizada: str):
+    """
+    Retorna (bloque, cruce, casa) de una dirección ``TIPO NUM ...`` normalizada,
+    con '' en cruce/casa si faltan, o None si no tiene esa forma.
+    """
+    tokens = normalizada.split()
+    if len(tokens) < 2 or tokens[0] not in _tipos_via() or not tokens[1][:1].isdigit():
+        return None
+    numeros = []
+    cuadrante = ''
+    for token in tokens[1:]:
+        sufijo = _CUADRANTE.fullmatch(token)
+        if sufijo:
+            cuadrante = sufijo.group(1)
+        # Los números después de la placa no cambian la dirección física
+        numero = _NUMERO.match(token)
+        if numero and len(numeros) < 3:
+            numeros.append(numero.group(1))
+    numeros += [''] * (3 - len(numeros))
+    via, cruce, casa = numeros
+    return (reglas.TIPOS_VIA.get(tokens[0], tokens[0]), via, cuadrante), cruce, casa
+
+
+def agrupar(normalizadas) -> list:
+    """
+    Retorna el número de grupo (desde 1, en orden de aparición) de cada dirección
+    normalizada, o None si está vacía.
+    """
+    normalizadas = [
+        normalizada if isinstance(normalizada, str) and normalizada.strip() else None
+        for normalizada in normalizadas
+    ]
+    # Las exportaciones repiten mucho las mismas direcciones
+    distintas = {normalizada: None for normalizada in normalizadas if normalizada is not None}
+    for normalizada in distintas:
+        distintas[normalizada] = componentes(normalizada)
+    partes = [distintas.get(normalizada) for normalizada in normalizadas]
+
+    # Índice invertido: (bloque, cruce) -> números de casa vistos
+    casas = defaultdict(set)
+    for parte in partes:
+        if parte is not None and parte[2]:
+            casas[parte[:2]].add(parte[2])
+
+    grupos = {}
+    resultado = []
+    for normalizada, parte in zip(normalizadas, partes):
+        if normalizada is None:
+            resultado.append(None)
+            continue
+        # Sin vía que cruza no hay placa: solo se agrupa el texto idéntico
+        if parte is None or not parte[1]:
+            clave = ' '.join(normalizada.split())
+        else:
+            bloque, cruce, casa = parte
+            if not casa and len(casas.get((bloque, cruce), ())) == 1:
+                casa = next(iter(casas[(bloque, cruce)]))
+            clave = (bloque, cruce, casa)
+        resultado.append(grupos.setdefault(clave, len(grupos) + 1))
+    return resultado
+
+
+def group_duplicates(df: pd.DataFrame, column_name: str = "Direccion Estandarizada",
+                     id_column: str = None) -> pd.DataFrame:
+    """
+    Agrega a df las columnas "Grupo Direccion" (grupo de la dirección física) y
+    "Filas en Grupo" y lo retorna. Con id_column (p. ej. el NIT) agrega también
+    "Identificaciones en Grupo": cuántas identificaciones distintas comparten
+    la dirección.
+    """
+    for columna in (column_name, id_column):
+        if columna is not None and columna not in df.columns:
+            raise ValueError(f"La columna '{columna}' no existe en el archivo de entrada.")
+
+    grupos = pd.Series(agrupar(df[column_name].tolist()), index=df.index, dtype='Int64')
+    df[COLUMNA_GRUPO] = grupos
+    df[COLUMNA_TAMANO] = grupos.map(grupos.value_counts()).astype('Int64')
+    if id_column is not None:
+        filas = pd.DataFrame({'grupo': grupos.to_numpy(), 'id': df[id_column].to_numpy()})
+        identificaciones = filas.dropna(subset=['grupo']).groupby('grupo')['id'].nunique()
+        df[COLUMNA_IDENTIFICACIONES] = grupos.map(identificaciones).astype('Int64')
+    return df
+
+
+def resumen(df: pd.DataFrame) -> str:
+    tamanos = df.drop_duplicates(COLUMNA_GRUPO)[COLUMNA_TAMANO].dropna()
+    repetidos = tamanos[tamanos > 1]
+    return (
+        f"Duplicados: {len(tamanos)} direcciones físicas distintas; {len(repetidos)} grupos con "
+        f"más de una fila ({int(repetidos.sum())} filas)"
+    )
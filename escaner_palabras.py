@@ -0,0 +1,229 @@
+"""
+Escáner de palabras clave para direcciones.
+
+Reemplaza las alternancias gigantes ``\\b(A|B|C...)\\b`` con ``re.IGNORECASE``
+(ciudades, departamentos, descriptivos, tipos de vía) por un recorrido único
+sobre las palabras de la cadena. Cada palabra se busca en un diccionario y las
+frases de varias palabras (``SANTA ROSA DE CABAL``) se resuelven con un trie,
+de modo que el costo depende del largo de la dirección y no del tamaño de las
+listas.
+
+Las coincidencias respetan la semántica de las expresiones regulares que
+reemplazan: una palabra es una secuencia ``\\w+`` completa, las frases exigen
+exactamente un espacio entre palabras y, si varias frases empiezan en la misma
+palabra, gana la más larga.
+"""
+import re
+
+
+# Clases de palabras clave (se combinan como banderas)
+DESCRIPTIVO = 1
+CIUDAD = 2
+LUGAR_ADICIONAL = 4
+DEPARTAMENTO = 8
+TIPO_VIA = 16
+
+_SEPARADORES = re.compile(r'(\W+)')
+_LARGO_MAXIMO_PREFIJO = 128
+
+# Caracteres que siguen siendo distintos tras upper() pero que re.IGNORECASE
+# considera iguales a una letra ASCII
+_EQUIVALENCIAS = str.maketrans({'\u0130': 'I', '\u212a': 'K'})
+
+
+def _clave(texto: str) -> str:
+    if texto.isascii():
+        return texto.upper()
+    # Conservar la longitud: ignorar mayúsculas que expanden el carácter (ß -> SS)
+    return ''.join(c.upper() if len(c.upper()) == 1 else c for c in texto).translate(_EQUIVALENCIAS)
+
+
+def _partes(s: str):
+    """
+    Divide ``s`` en ``[palabra, separador, palabra, ...]`` (las palabras quedan
+    en las posiciones pares, posiblemente vacías en los extremos) y retorna
+    también la clave de cada parte.
+    """
+    partes = _SEPARADORES.split(s)
+    if s.isascii():
+        return partes, _SEPARADORES.split(s.upper())
+    return partes, [_clave(p) for p in partes]
+
+
+class EscanerPalabras:
+    """
+    Clasifica en una sola pasada las palabras clave de una cadena.
+
+    ``grupos`` es una secuencia de pares ``(clase, palabras)``. Cada entrada
+    puede ser una palabra, una frase separada por espacios o una expresión
+    regular de una sola palabra (p. ej. ``L\\d+``).
+    """
+
+    def __init__(self, grupos):
+        self._palabras = {}
+        self._frases = {}
+        patrones = []
+        for clase, entradas in grupos:
+            for entrada in entradas:
+                partes = entrada.split(' ')
+                if len(partes) > 1:
+                    resto = tuple(_clave(p) for p in partes[1:])
+                    frases = self._frases.setdefault(_clave(partes[0]), {})
+                    frases[resto] = frases.get(resto, 0) | clase
+                elif re.escape(entrada) != entrada:
+                    patrones.append((re.compile(entrada, re.IGNORECASE), clase))
+                else:
+                    clave = _clave(entrada)
+                    self._palabras[clave] = self._palabras.get(clave, 0) | clase
+        # Frases más largas primero
+        self._frases = {
+            primera: tuple(sorted(frases.items(), key=lambda f: -len(f[0])))
+            for primera, frases in self._frases.items()
+        }
+        self._patrones = tuple(patrones)
+        # Primeras letras posibles de las palabras que solo reconoce un patrón
+        self._iniciales_patron = None
+        if all(p.pattern[:1].isalpha() for p, _ in patrones):
+            self._iniciales_patron = {p.pattern[0].upper() for p, _ in patrones}
+
+    def clasificar(self, clave: str) -> int:
+        """
+        Retorna las clases de una palabra ya convertida en clave (mayúsculas).
+        """
+        return self._clasificar_todas((clave,))[0]
+
+    def _clasificar_todas(self, claves) -> list:
+        get = self._palabras.get
+        clases = [get(clave, 0) for clave in claves]
+        if self._patrones:
+            iniciales = self._iniciales_patron
+            for k, clave in enumerate(claves):
+                if iniciales is None or clave[:1] in iniciales:
+                    for patron, clase in self._patrones:
+                        if patron.fullmatch(clave):
+                            clases[k] |= clase
+        return clases
+
+    def _frases_desde(self, partes, claves, i, eliminadas):
+        """
+        Genera ``(j, clases)`` por cada frase que empieza en la parte ``i`` y
+        termina en la parte ``j``, sin pasar por partes ya eliminadas.
+        """
+        for resto, clases in self._frases.get(claves[i], ()):
+            j = i + 2 * len(resto)
+            if j >= len(partes):
+                continue
+            for k, esperada in enumerate(resto):
+                actual = i + 2 * (k + 1)
+                if claves[actual] != esperada or partes[actual - 1] != ' ' or actual in eliminadas:
+                    break
+            else:
+                yield j, clases
+
+    def posiciones(self, s: str, clases: int) -> list:
+        """
+        Retorna la posición inicial de cada palabra de ``s`` que (por sí sola)
+        pertenece a ``clases``.
+        """
+        partes, claves = _partes(s)
+        clases_de = self._clasificar_todas(claves[0::2])
+        if not any(c & clases for c in clases_de):
+            return []
+        posiciones = []
+        inicio = 0
+        for i, parte in enumerate(partes):
+            if i % 2 == 0 and clases_de[i // 2] & clases:
+                posiciones.append(inicio)
+            inicio += len(parte)
+        return posiciones
+
+    def prefijos(self, s: str, clases: int) -> list:
+        """
+        Por cada palabra o frase de ``clases`` con que empieza ``s`` seguida de
+        espacios en blanco, la posición donde terminan esos espacios; de la
+        frase más larga a la palabra sola.
+        """
+        # Las frases clave tienen pocas palabras: basta con mirar el inicio
+        partes, claves = _partes(s[:_LARGO_MAXIMO_PREFIJO])
+        if not partes[0]:
+            return []
+        candidatas = [j for j, c in self._frases_desde(partes, claves, 0, ()) if c & clases]
+        if self.clasificar(claves[0]) & clases:
+            candidatas.append(0)
+        posiciones = []
+        for j in candidatas:
+            fin = len(''.join(partes[:j + 1]))
+            if s[fin:fin + 1].isspace():
+                posiciones.append(len(s) - len(s[fin:].lstrip()))
+        return posiciones
+
+
+def desde_prefijo(s: str, posiciones, siguiente: str = '') -> int:
+    """
+    Primera de ``posiciones`` (ver ``EscanerPalabras.prefijos``) donde el
+    texto de ``s`` empieza con ``siguiente``, o -1.
+    """
+    for posicion in posiciones:
+        if s[posicion:posicion + len(siguiente)].upper() == siguiente:
+            return posicion
+    return -1
+
+
+class EliminadorPalabras:
+    """
+    Elimina palabras clave en pasadas sucesivas, una por cada máscara de
+    ``pasadas``, como lo haría una cadena de ``re.sub`` con alternancias.
+
+    Expone ``sub(reemplazo, s)`` para usarse como patrón de una ``Regla``.
+    """
+
+    def __init__(self, escaner: EscanerPalabras, *pasadas: int):
+        self.escaner = escaner
+        self.pasadas = pasadas
+        self._todas = 0
+        for clases in pasadas:
+            self._todas |= clases
+
+    def sub(self, reemplazo: str, s: str) -> str:
+        escaner = self.escaner
+        partes, claves = _partes(s)
+        n = len(partes)
+        clases_de = escaner._clasificar_todas(claves[0::2])
+        # Solo pueden eliminarse palabras clave o inicios de frase
+        candidatas = [
+            i for i in range(0, n, 2)
+            if clases_de[i // 2] & self._todas or claves[i] in escaner._frases
+        ]
+        if not candidatas:
+            return s
+        # Índice de la primera y última parte de cada tramo eliminado
+        tramos = {}
+        eliminadas = set()
+        for clases in self.pasadas:
+            siguiente = 0
+            for i in candidatas:
+                if i < siguiente or i in eliminadas:
+                    continue
+                j = -1
+                if claves[i] in escaner._frases:
+                    j = next((j for j, c in escaner._frases_desde(partes, claves, i, eliminadas) if c & clases), -1)
+                if j < 0 and clases_de[i // 2] & clases:
+                    j = i
+                if j < 0:
+                    continue
+                tramos[i] = j
+                eliminadas.update(range(i, j + 1, 2))
+                siguiente = j + 2
+        if not tramos:
+            return s
+        resultado = []
+        i = 0
+        while i < n:
+            j = tramos.get(i)
+            if j is None:
+                resultado.append(partes[i])
+                i += 1
+            else:
+                resultado.append(reemplazo)
+                i = j + 1
+        return ''.join(resultado)
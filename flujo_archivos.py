@@ -0,0 +1,330 @@
+"""
+Lectura y escritura por bloques de archivos de direcciones.
+
+Permite normalizar archivos más grandes que la memoria: la entrada se lee en
+bloques de filas de tamaño acotado (openpyxl en modo solo lectura para xlsx,
+``read_csv`` por trozos para csv y grupos de filas para parquet) y la salida se
+escribe a medida que llegan los bloques. El formato se deduce de la extensión.
+También lee y escribe archivos completos en los mismos formatos y selecciona un
+rango de filas de una secuencia de bloques.
+
+Parquet requiere ``pyarrow`` (dependencia opcional).
+"""
+import os
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import pandas as pd
+
+FORMATOS = ('.xlsx', '.csv', '.parquet')
+TAMANO_BLOQUE = 50000
+
+# Bytes del inicio de un csv con los que se estima su número de filas
+MUESTRA_CSV = 1024 * 1024
+
+_XLSX = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELACION = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+_FILA_FINAL = re.compile(r'(\d+)$')
+
+
+def _formato(path: str) -> str:
+    formato = os.path.splitext(path)[1].lower()
+    if formato not in FORMATOS:
+        raise ValueError(
+            f"Formato no soportado: '{path}'. Use uno de: {', '.join(FORMATOS)}"
+        )
+    return formato
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Para leer o escribir parquet instale pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def leer_bloques(path: str, tamano_bloque: int = TAMANO_BLOQUE):
+    """
+    Genera DataFrames con hasta tamano_bloque filas del archivo, en orden.
+    """
+    if tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser al menos 1.")
+    formato = _formato(path)
+    if formato == '.xlsx':
+        yield from _leer_xlsx(path, tamano_bloque)
+    elif formato == '.csv':
+        yield from pd.read_csv(path, dtype=str, chunksize=tamano_bloque)
+    else:
+        pyarrow = _importar_pyarrow()
+        archivo = pyarrow.parquet.ParquetFile(path)
+        for lote in archivo.iter_batches(batch_size=tamano_bloque):
+            yield lote.to_pandas()
+
+
+def leer_archivo(path: str) -> pd.DataFrame:
+    """
+    Lee el archivo completo (xlsx, csv o parquet). Como en ``leer_bloques``,
+    las columnas de un csv se leen como texto.
+    """
+    formato = _formato(path)
+    if formato == '.xlsx':
+        return pd.read_excel(path)
+    if formato == '.csv':
+        return pd.read_csv(path, dtype=str)
+    _importar_pyarrow()
+    return pd.read_parquet(path)
+
+
+def escribir_archivo(df: pd.DataFrame, path: str):
+    """
+    Escribe df completo en el formato de la extensión de path, sin el índice.
+    """
+    formato = _formato(path)
+    if formato == '.xlsx':
+        df.to_excel(path, index=False)
+    elif formato == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        _importar_pyarrow()
+        df.to_parquet(path, index=False)
+
+
+def contar_filas(path: str) -> int:
+    """
+    Número de filas de datos del archivo (sin el encabezado). Parquet lo trae
+    en sus metadatos; xlsx y csv se recorren una vez por bloques.
+    """
+    formato = _formato(path)
+    if formato == '.parquet':
+        return _importar_pyarrow().parquet.ParquetFile(path).metadata.num_rows
+    if formato == '.csv':
+        return sum(len(bloque) for bloque in pd.read_csv(path, dtype=str, usecols=[0], chunksize=TAMANO_BLOQUE))
+    return sum(len(bloque) for bloque in _leer_xlsx(path, TAMANO_BLOQUE))
+
+
+def estimar_filas(path: str):
+    """
+    Número aproximado de filas de datos sin recorrer el archivo, o None si no
+    se puede estimar. Parquet lo trae exacto en sus metadatos; para xlsx se usa
+    la dimensión que declara la hoja y para csv el largo promedio de las líneas
+    del inicio del archivo.
+    """
+    formato = _formato(path)
+    if formato == '.parquet':
+        return contar_filas(path)
+    if formato == '.xlsx':
+        return _dimension_xlsx(path)
+    with open(path, 'rb') as f:
+        muestra = f.read(MUESTRA_CSV)
+    lineas = muestra.count(b'\n')
+    if not lineas:
+        return None
+    if len(muestra) < MUESTRA_CSV:
+        return max(lineas - 1, 0)
+    return max(round(os.path.getsize(path) * lineas / len(muestra)) - 1, 0)
+
+
+def _dimension_xlsx(path: str):
+    # Solo lee el libro y el inicio de la hoja activa: openpyxl cargaría antes
+    # todos los textos compartidos
+    try:
+        with zipfile.ZipFile(path) as archivo:
+            libro = ElementTree.fromstring(archivo.read('xl/workbook.xml'))
+            vista = libro.find(f'{_XLSX}bookViews/{_XLSX}workbookView')
+            activa = int(vista.get('activeTab', 0)) if vista is not None else 0
+            hoja = libro.findall(f'{_XLSX}sheets/{_XLSX}sheet')[activa]
+            relaciones = ElementTree.fromstring(archivo.read('xl/_rels/workbook.xml.rels'))
+            destino = next(
+                relacion.get('Target') for relacion in relaciones if relacion.get('Id') == hoja.get(_RELACION)
+            )
+            destino = destino.lstrip('/') if destino.startswith('/') else posixpath.join('xl', destino)
+            with archivo.open(destino) as contenido:
+                for _, elemento in ElementTree.iterparse(contenido):
+                    if elemento.tag == f'{_XLSX}dimension':
+                        # Algunos escritores declaran solo A1 aunque la hoja tenga datos
+                        fila = _FILA_FINAL.search(elemento.get('ref', ''))
+                        return int(fila.group(1)) - 1 if fila and int(fila.group(1)) > 1 else None
+                    if elemento.tag == f'{_XLSX}row':
+                        return None
+    except (KeyError, IndexError, ValueError, StopIteration, zipfile.BadZipFile, ElementTree.ParseError):
+        return None
+    return None
+
+
+def seleccionar_filas(bloques, filas: range):
+    """
+    Genera, de una secuencia de bloques consecutivos, solo las filas cuya
+    posición (desde 0, sin el encabezado) está en ``filas``, un range con paso 1.
+    Deja de consumir bloques al pasar el final del rango.
+    """
+    inicio = 0
+    for bloque in bloques:
+        fin = inicio + len(bloque)
+        desde, hasta = max(filas.start, inicio), min(filas.stop, fin)
+        if hasta - desde == len(bloque):
+            yield bloque
+        elif desde < hasta:
+            yield bloque.iloc[desde - inicio:hasta - inicio].copy()
+        if fin >= filas.stop:
+            return
+        inicio = fin
+
+
+def _leer_xlsx(path: str, tamano_bloque: int):
+    from openpyxl import load_workbook
+
+    libro = load_workbook(path, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        # Mismos nombres que asigna pandas a columnas sin encabezado
+        columnas = [
+            f"Unnamed: {i}" if nombre is None else nombre
+            for i, nombre in enumerate(encabezado)
+        ]
+        bloque = []
+        vacias = []
+        for fila in filas:
+            fila = tuple(fila[:len(columnas)]) + (None,) * (len(columnas) - len(fila))
+            # Como pd.read_excel, descartar las filas vacías del final del archivo
+            if all(valor is None for valor in fila):
+                vacias.append(fila)
+                continue
+            bloque.extend(vacias)
+            vacias = []
+            bloque.append(fila)
+            if len(bloque) >= tamano_bloque:
+                yield pd.DataFrame(bloque[:tamano_bloque], columns=columnas)
+                bloque = bloque[tamano_bloque:]
+        while bloque:
+            yield pd.DataFrame(bloque[:tamano_bloque], columns=columnas)
+            bloque = bloque[tamano_bloque:]
+    finally:
+        libro.close()
+
+
+def _es_nulo(valor) -> bool:
+    # NaN y NaT son distintos de sí mismos
+    return valor is None or valor is pd.NA or valor != valor
+
+
+def esquema_parquet(path: str):
+    """
+    Esquema (pyarrow) de un archivo parquet, para escribir la salida con los
+    mismos tipos de columna.
+    """
+    return _importar_pyarrow().parquet.ParquetFile(path).schema_arrow
+
+
+def _como_texto(valores: pd.Series) -> list:
+    return [None if _es_nulo(valor) else str(valor) for valor in valores]
+
+
+class EscritorBloques:
+    """
+    Escribe DataFrames de forma incremental en un archivo xlsx, csv o parquet.
+    Todos los bloques deben tener las mismas columnas. Usar como context manager,
+    o llamar a ``cerrar`` al terminar y a ``descartar`` si algo falla.
+
+    El archivo se escribe con un nombre temporal y toma su nombre final solo al
+    cerrar: una ejecución que falla no deja una salida truncada.
+
+    En parquet el tipo de cada columna no puede cambiar entre bloques. Con
+    ``esquema`` (el de la entrada, si también es parquet) sus columnas conservan
+    los tipos de la entrada; las demás columnas se escriben como texto, igual que
+    el lector de csv las lee, para que un bloque no dependa del tipo que pandas
+    infirió en el primero (enteros y luego ``900123-1``, o una columna vacía).
+    """
+
+    def __init__(self, path: str, esquema=None):
+        self.path = path
+        self.formato = _formato(path)
+        self._temporal = f"{path}.parcial"
+        self._destino = None
+        self._esquema_entrada = esquema
+        self._esquema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+
+    def escribir(self, df: pd.DataFrame):
+        if self.formato == '.xlsx':
+            self._escribir_xlsx(df)
+        elif self.formato == '.csv':
+            encabezado = self._destino is None
+            if encabezado:
+                self._destino = open(self._temporal, 'w', encoding='utf-8', newline='')
+            df.to_csv(self._destino, header=encabezado, index=False)
+        else:
+            self._escribir_parquet(df)
+
+    def _escribir_xlsx(self, df: pd.DataFrame):
+        if self._destino is None:
+            from openpyxl import Workbook
+
+            # En modo solo escritura las filas se vuelcan a disco a medida que llegan
+            self._destino = Workbook(write_only=True)
+            self._hoja = self._destino.create_sheet("Sheet1")
+            self._hoja.append(list(df.columns))
+        for fila in df.itertuples(index=False, name=None):
+            self._hoja.append([None if _es_nulo(valor) else valor for valor in fila])
+
+    def _escribir_parquet(self, df: pd.DataFrame):
+        pyarrow = _importar_pyarrow()
+        if self._esquema is None:
+            entrada = self._esquema_entrada
+            self._esquema = pyarrow.schema([
+                entrada.field(columna) if entrada is not None and columna in entrada.names
+                else pyarrow.field(columna, pyarrow.string())
+                for columna in df.columns
+            ])
+        texto = {
+            columna: _como_texto(df[columna])
+            for columna in df.columns if pyarrow.types.is_string(self._esquema.field(columna).type)
+        }
+        if texto:
+            df = df.assign(**texto)
+        tabla = pyarrow.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+        if self._destino is None:
+            self._destino = pyarrow.parquet.ParquetWriter(self._temporal, self._esquema)
+        self._destino.write_table(tabla)
+
+    def cerrar(self):
+        """
+        Termina el archivo y le da su nombre final.
+        """
+        if self._destino is None:
+            return
+        if self.formato == '.xlsx':
+            self._destino.save(self._temporal)
+        else:
+            self._destino.close()
+        self._destino = None
+        os.replace(self._temporal, self.path)
+
+    def descartar(self):
+        """
+        Abandona el archivo a medio escribir (tras un error) sin tocar ``path``.
+        """
+        if self._destino is None:
+            return
+        if self.formato == '.xlsx':
+            # El libro aún no llegó a disco; basta cerrar la hoja en curso
+            self._hoja.close()
+        else:
+            self._destino.close()
+        self._destino = None
+        if os.path.exists(self._temporal):
+            os.remove(self._temporal)
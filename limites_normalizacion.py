@@ -0,0 +1,174 @@
+"""
+Modo blindado de la normalización: límites por dirección (opcional).
+
+Una sola fila patológica (una nota pegada en la celda, miles de palabras
+repetidas) no debe detener un lote completo. Con un ``LimitesNormalizacion``:
+
+- Las direcciones de más de ``longitud_maxima`` caracteres se rechazan (motivo
+  ``larga``) sin aplicar ninguna regla.
+- Cada dirección tiene un presupuesto de tiempo de CPU (``presupuesto_ms``). Se
+  aplica con una alarma del sistema (``signal.setitimer``), que interrumpe
+  también una expresión regular en curso; al agotarse la dirección se rechaza
+  (motivo ``tiempo``). Se cuenta tiempo de CPU y no de reloj para que un proceso
+  que espera su turno (varios procesos en pocos núcleos) no rechace direcciones
+  normales. La alarma solo existe en Unix y en el hilo principal: en otro caso
+  las direcciones que superan el presupuesto se conservan y se reportan con
+  motivo ``lenta``.
+- Las direcciones excedidas se ubican en las filas de entrada (``ubicar``) y
+  se exportan a un archivo CSV aparte para revisarlas.
+
+Sin límites no hay costo adicional.
+"""
+import csv
+import signal
+import threading
+import time
+from collections import Counter
+
+from cache_normalizacion import clave_cache
+
+LONGITUD_MAXIMA = 256
+PRESUPUESTO_MS = 50.0
+
+# Caracteres de la dirección que se copian al reporte (la longitud va completa)
+LONGITUD_REPORTE = 500
+
+COLUMNAS = ('fila', 'motivo', 'longitud', 'milisegundos', 'direccion')
+
+
+class TiempoAgotado(Exception):
+    """
+    La normalización de una dirección superó el presupuesto de tiempo.
+    """
+
+
+def _agotar(signum, frame):
+    raise TiempoAgotado()
+
+
+def alarma_disponible() -> bool:
+    return hasattr(signal, 'ITIMER_PROF') and threading.current_thread() is threading.main_thread()
+
+
+class LimitesNormalizacion:
+    """
+    Longitud máxima y presupuesto de tiempo por dirección, con el registro de
+    las direcciones que los exceden.
+
+    ``excedidas`` guarda, por dirección (con la clave de la cache), el motivo,
+    la longitud y los milisegundos; ``filas`` las filas de entrada donde
+    aparecen, una vez ubicadas.
+    """
+
+    def __init__(self, longitud_maxima: int = LONGITUD_MAXIMA, presupuesto_ms: float = PRESUPUESTO_MS):
+        if longitud_maxima < 1:
+            raise ValueError("La longitud máxima debe ser al menos 1.")
+        if presupuesto_ms <= 0:
+            raise ValueError("El presupuesto de tiempo debe ser mayor que 0.")
+        self.longitud_maxima = longitud_maxima
+        self.presupuesto_ms = presupuesto_ms
+        self.excedidas = {}
+        self.filas = []
+        self._filas_vistas = 0
+
+    def vacio(self) -> 'LimitesNormalizacion':
+        """
+        Límites con la misma configuración y sin registros (p. ej. para un lote
+        que se procesa en otro proceso).
+        """
+        return LimitesNormalizacion(self.longitud_maxima, self.presupuesto_ms)
+
+    def normalizar_lote(self, addresses, normalizar, rechazar) -> list:
+        """
+        Aplica ``normalizar(address)`` a cada dirección dentro de los límites.
+        ``rechazar(motivo)`` da el resultado de una dirección rechazada.
+        """
+        alarma = alarma_disponible()
+        presupuesto = self.presupuesto_ms / 1000
+        anterior = signal.signal(signal.SIGPROF, _agotar) if alarma else None
+        reloj = time.process_time
+        resultados = []
+        try:
+            for address in addresses:
+                if isinstance(address, str) and len(address) > self.longitud_maxima:
+                    self._exceder(address, 'larga', 0.0)
+                    resultados.append(rechazar('larga'))
+                    continue
+                inicio = reloj()
+                try:
+                    if alarma:
+                        signal.setitimer(signal.ITIMER_PROF, presupuesto)
+                    try:
+                        resultado = normalizar(address)
+                    finally:
+                        if alarma:
+                            signal.setitimer(signal.ITIMER_PROF, 0)
+                except TiempoAgotado:
+                    self._exceder(address, 'tiempo', reloj() - inicio)
+                    resultados.append(rechazar('tiempo'))
+                    continue
+                segundos = reloj() - inicio
+                if segundos > presupuesto:
+                    self._exceder(address, 'lenta', segundos)
+                resultados.append(resultado)
+        finally:
+            if alarma:
+                signal.signal(signal.SIGPROF, anterior)
+        return resultados
+
+    def _exceder(self, address, motivo: str, segundos: float):
+        self.excedidas[clave_cache(address)] = (motivo, len(str(address)), round(segundos * 1000, 3))
+
+    def combinar(self, otro: 'LimitesNormalizacion'):
+        """
+        Suma las direcciones excedidas y las filas ubicadas de otro registro
+        (p. ej. el de un lote procesado en otro proceso).
+        """
+        self.excedidas.update(otro.excedidas)
+        self.filas.extend(otro.filas)
+
+    def saltar(self, filas: int):
+        """
+        Avanza la numeración de ``ubicar`` en filas de la entrada que no se
+        procesan (p. ej. las anteriores a un rango de filas).
+        """
+        self._filas_vistas += filas
+
+    def ubicar(self, direcciones):
+        """
+        Registra las filas de ``direcciones`` (una Series o una lista) con
+        direcciones excedidas. Las llamadas sucesivas se toman como bloques
+        consecutivos de la misma entrada; ``fila`` es el número de fila en el
+        archivo (la 1 es el encabezado).
+        """
+        direcciones = list(direcciones)
+        inicio = self._filas_vistas
+        self._filas_vistas += len(direcciones)
+        if not self.excedidas:
+            return
+        for posicion, address in enumerate(direcciones):
+            # Solo las direcciones largas o lentas pueden estar registradas
+            exceso = self.excedidas.get(clave_cache(address)) if isinstance(address, str) else None
+            if exceso is not None:
+                motivo, longitud, milisegundos = exceso
+                self.filas.append({
+                    'fila': inicio + posicion + 2, 'motivo': motivo, 'longitud': longitud,
+                    'milisegundos': milisegundos, 'direccion': address[:LONGITUD_REPORTE],
+                })
+
+    def exportar(self, path: str):
+        """
+        Guarda las filas ubicadas en un archivo CSV con las columnas de ``COLUMNAS``.
+        """
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+            escritor.writeheader()
+            escritor.writerows(self.filas)
+
+    def resumen(self) -> str:
+        motivos = Counter(fila['motivo'] for fila in self.filas)
+        detalle = ', '.join(f"{motivo} {cantidad}" for motivo, cantidad in motivos.most_common())
+        return (
+            f"Modo blindado (máximo {self.longitud_maxima} caracteres, {self.presupuesto_ms:g} ms por "
+            f"dirección): {len(self.filas)} filas excedidas ({detalle or '-'})"
+        )
@@ -1,6 +1,44 @@
 import pandas as pd
-import re
+import argparse
+import hashlib
+import inspect
+import glob
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cache_normalizacion
+import escaner_palabras
+import reglas_normalizacion as reglas
+import resultado_normalizacion
+from almacen_normalizacion import AlmacenNormalizacion
+from escaner_palabras import CIUDAD, TIPO_VIA, _clave, desde_prefijo
+from cache_normalizacion import TAMANO_CACHE, CacheNormalizacion
+from duplicados_normalizacion import group_duplicates, resumen as resumen_duplicados
+from flujo_archivos import (
+    FORMATOS, TAMANO_BLOQUE, EscritorBloques, contar_filas, escribir_archivo, esquema_parquet, estimar_filas,
+    leer_archivo, leer_bloques, seleccionar_filas,
+)
+from limites_normalizacion import LONGITUD_MAXIMA, PRESUPUESTO_MS, LimitesNormalizacion
+from perfil_normalizacion import ConteoManejadores, PerfilNormalizacion
+from progreso_normalizacion import ProgresoNormalizacion, duracion
+from resultado_normalizacion import CAMPOS, DireccionNormalizada, rechazada
+from reglas_normalizacion import aplicar_fase, buscar_en
+
+# Procesamiento por lotes: direcciones por lote enviado a cada proceso y
+# mínimo de direcciones para que valga la pena arrancar procesos
+TAMANO_LOTE = 5000
+MINIMO_PARALELO = 20000
+
+# Manejadores especiales que pueden aplicar a una dirección (banderas de _clasificar)
+_AEROPUERTO = 1
+_VIA = 2
+_AUTOPISTA = 4
+_KM_VIA = 8
+# Manejadores que necesitan la dirección sin la ciudad del inicio
+_USAN_CIUDAD = _AEROPUERTO | _VIA | _AUTOPISTA
 
 def normalize_via_type(s: str) -> str:
     """
@@ -9,21 +47,329 @@ def normalize_via_type(s: str) -> str:
     s_upper = s.upper()
     
     # Mapeo de tipos de vía - ACTUALIZADO: ACL->CL, ACR->KR, AENIDA->AV
-    if s_upper in ['CALLE', 'CLL', 'CL', 'CALL', 'AC', 'ACL']:
-        return 'CL'
-    elif s_upper in ['CARRERA', 'CRA', 'KRA', 'KR', 'CARR', 'AK', 'K', 'ACR']:
-        return 'KR'
-    elif s_upper in ['AVENIDA', 'AENIDA', 'AV', 'AVD', 'AVDA', 'AVE']:
-        return 'AV'
-    elif s_upper in ['DIAGONAL', 'DG', 'DIAG']:
-        return 'DG'
-    elif s_upper in ['TRANSVERSAL', 'TV', 'TRANSV', 'TR', 'TRAVERSAL', 'TRANVERSAL', 'TRANSVERSA', 'TRANSVERAL', 'TRANSVESAL']:
-        return 'TV'
+    return reglas.TIPOS_VIA.get(s_upper, s_upper)
+
+
+def _clasificar(s: str) -> int:
+    """
+    Decide una sola vez qué manejadores especiales pueden aplicar a s (ya en
+    mayúsculas y con AEROPUERTO corregido) y retorna sus banderas. Cada prueba
+    es una búsqueda de subcadena que el manejador necesita para coincidir, así
+    que la gran mayoría de las direcciones pasa directo a los patrones finales
+    sin recorrer las expresiones de AEROPUERTO, VIA, AUTOPISTA y KM.
+    """
+    # Misma equivalencia de mayúsculas que re.IGNORECASE (K de Kelvin, İ)
+    clave = s if s.isascii() else _clave(s)
+    clases = 0
+    if 'AEROPUERTO' in s:
+        clases |= _AEROPUERTO
+    if 'VIA' in clave:
+        clases |= _VIA
+    # Todas las variantes de autopista (también AUTO PISTA y AUTOP) empiezan por AUT
+    if 'AUT' in clave:
+        clases |= _AUTOPISTA
+    if 'KM' in clave or 'K.M' in clave or 'KILOMETRO' in clave:
+        clases |= _KM_VIA
+    return clases
+
+
+def _manejar_aeropuerto(s: str, sin_ciudad: str):
+    """
+    AEROPUERTO: mantiene el nombre del aeropuerto sin ciudades ni complementos.
+    ``sin_ciudad`` es s sin la ciudad del inicio.
+    """
+    # Si la dirección contiene AEROPUERTO, tratarla especialmente
+    if 'AEROPUERTO' not in s:
+        return None
+    s_aeropuerto = sin_ciudad.strip()
+    # Eliminar adicionales como LOCAL, MUELLE, PISO, BODEGA, HANGAR, etc.
+    s_aeropuerto = reglas.COMPLEMENTOS_AEROPUERTO_RE.sub('', s_aeropuerto).strip()
+    # Compactar espacios
+    s_aeropuerto = reglas.ESPACIOS.sub(' ', s_aeropuerto).strip()
+    if s_aeropuerto:
+        return DireccionNormalizada(name=s_aeropuerto, handler='aeropuerto')
+    return None
+
+
+def _manejar_via(s: str, sin_ciudad: str):
+    """
+    VIA (carreteras, rutas): mantiene la descripción de la vía pero la limpia.
+    ``sin_ciudad`` es s sin la ciudad del inicio.
+    """
+    if not reglas.PALABRA_VIA.search(s):
+        return None
+    s_via = sin_ciudad.strip()
+    # Eliminar adicionales como LOCAL, MUELLE, PISO, BODEGA, etc. y todo lo que viene después
+    s_via = reglas.COMPLEMENTOS_VIA_RE.sub('', s_via).strip()
+    # Compactar espacios
+    s_via = reglas.ESPACIOS.sub(' ', s_via).strip()
+    if s_via and len(s_via) > 3:  # Evitar retornar solo "VIA"
+        return DireccionNormalizada(name=s_via, handler='via')
+    return None
+
+
+def _manejar_autopista(s: str):
+    """
+    AUTOPISTA (AUT, AUTO, etc.): normaliza a AUTOPISTA NOMBRE [KM n] [TIPO NUM NUM].
+    """
+    # Detectar si es una autopista (AUT, AUTO, AUTOPISTA)
+    aut_check = reglas.AUTOPISTA_INICIO.match(s)
+    if not aut_check:
+        return None
+
+    # Es una dirección de autopista
+    aut_name = None
+    resto_aut = None
+    
+    # Primer intento: capturar AUTOPISTA. o AUT. o AUTO. (con punto o palabra completa)
+    prefijo_match = reglas.AUTOPISTA_CON_PUNTO.match(s)
+    if prefijo_match:
+        resto_aut = prefijo_match.group(2).strip()
     else:
-        return s_upper
+        # Segundo intento: capturar AUTO[PALABRAS] o AUT[PALABRAS] (pegado sin espacios)
+        prefijo_match = reglas.AUTOPISTA_PEGADA.match(s)
+        if prefijo_match:
+            aut_prefix = prefijo_match.group(1)
+            resto_aut = prefijo_match.group(2)
+            
+            # Extraer el nombre de la autopista desde el prefijo pegado
+            # Ej: AUTONORTE -> NORTE, AUTOMEDELLIN -> MEDELLIN, AUTOMED -> MED
+            if aut_prefix.upper().startswith('AUTO'):
+                aut_name = aut_prefix[4:]  # Quitar "AUTO"
+            elif aut_prefix.upper().startswith('AUT'):
+                aut_name = aut_prefix[3:]  # Quitar "AUT"
+            
+            # Si no hay resto, solo retornar el nombre de la autopista
+            if not resto_aut:
+                return DireccionNormalizada(name=aut_name, handler='autopista')
+        else:
+            # Tercer intento: capturar AUTOPISTA o AUTO o AUT seguido de espacio
+            prefijo_match = reglas.AUTOPISTA_CON_ESPACIO.match(s)
+            if prefijo_match:
+                resto_aut = prefijo_match.group(2).strip()
+    
+    # Si tenemos resto_aut pero no aut_name (casos con espacio), extraer el nombre
+    if resto_aut and not aut_name:
+        # Extraer solo la primera palabra como nombre de la autopista
+        palabras = resto_aut.split()
+        if palabras:
+            aut_name = palabras[0]
+            resto_aut = ' '.join(palabras[1:]) if len(palabras) > 1 else ''
+    
+    # Sin resto, la dirección sigue con los demás manejadores
+    if not resto_aut:
+        return None
+
+    # Si no tenemos aut_name, extraerlo de resto_aut
+    if not aut_name:
+        # Buscar patrón de KM primero para extraer el nombre
+        km_in_aut = reglas.AUTOPISTA_NOMBRE_ANTES_KM.search(resto_aut)
+        
+        if km_in_aut:
+            aut_name = km_in_aut.group(1).strip()
+        else:
+            # Extraer primeras palabras como nombre
+            nombre_match = reglas.AUTOPISTA_NOMBRE.match(resto_aut)
+            aut_name = nombre_match.group(1).strip() if nombre_match else resto_aut
+    
+    # Buscar patrón de KM dentro (incluyendo casos como "4KM" sin espacio)
+    km_in_aut = reglas.AUTOPISTA_KM.search(resto_aut)
+    
+    if km_in_aut:
+        # Tiene formato: [NOMBRE_AUTOPISTA] KM [numero] [resto]
+        km_num = km_in_aut.group(1) if km_in_aut.group(1) else km_in_aut.group(2)
+        resto_km = km_in_aut.group(3).strip() if km_in_aut.group(3) else ''
+        
+        # Limpiar resto_km de descriptivos
+        resto_km = reglas.AUTOPISTA_RESTO_KM.sub('', resto_km).strip()
+        resto_km = reglas.ESPACIOS.sub(' ', resto_km).strip()
+        
+        # Buscar tipo de vía en lo que sigue después del KM
+        if resto_km:
+            via_match = reglas.AUTOPISTA_VIA_KM.search(resto_km)
+            
+            if via_match:
+                via_type = normalize_via_type(via_match.group(1))
+                return DireccionNormalizada(via_type, name=aut_name, km=km_num, handler='autopista')
+            else:
+                return DireccionNormalizada(name=aut_name, km=km_num, handler='autopista')
+        else:
+            return DireccionNormalizada(name=aut_name, km=km_num, handler='autopista')
+    else:
+        # No tiene KM, buscar si tiene números o tipo de vía
+        # Eliminar complementos y descriptivos del resto (múltiples pasadas)
+        resto_limpio = resto_aut
+        
+        # Primera pasada: eliminar todas las palabras descriptivas
+        for _ in range(2):  # Dos pasadas para asegurar limpieza
+            resto_limpio = reglas.AUTOPISTA_DESCRIPTIVOS.sub(' ', resto_limpio)
+        
+        resto_limpio = resto_limpio.strip()
+        resto_limpio = reglas.ESPACIOS.sub(' ', resto_limpio).strip()
+        
+        # Reemplazar símbolos por espacios
+        resto_limpio = reglas.AUTOPISTA_SIMBOLOS.sub(' ', resto_limpio)
+        resto_limpio = reglas.ESPACIOS.sub(' ', resto_limpio).strip()
+        
+        # Buscar patrón: [TIPO] [num] [num] o directamente números
+        if resto_limpio:
+            via_match = reglas.AUTOPISTA_VIA_NUMEROS.search(resto_limpio)
+            
+            if via_match:
+                via_type = normalize_via_type(via_match.group(1))
+                num1 = via_match.group(2).strip().split()[0]
+                num2 = via_match.group(3).strip().split()[0]
+                return DireccionNormalizada(via_type, num1, num2=num2, name=aut_name, handler='autopista')
+            else:
+                # Buscar solo números
+                numeros = reglas.AUTOPISTA_NUMEROS.findall(resto_limpio)
+                if len(numeros) >= 2:
+                    return DireccionNormalizada(num1=numeros[0], num2=numeros[1], name=aut_name,
+                                                handler='autopista')
+                elif len(numeros) == 1:
+                    return DireccionNormalizada(num1=numeros[0], name=aut_name, handler='autopista')
+    
+    # Si llegamos aquí sin retornar, solo retornar el nombre de la autopista
+    if aut_name:
+        return DireccionNormalizada(name=aut_name, handler='autopista')
+    return rechazada('autopista', 'autopista')
+
+
+def _buscar_km_via(s: str):
+    """
+    ``reglas.KM_VIA`` desde el primer KM (lo mismo que buscar ``^(.*?)`` +
+    KM_VIA), en tiempo lineal: si no hay corte después del primer KM tampoco lo
+    hay después de los siguientes. La fase de coordenadas ya dejó la dirección
+    en una sola línea.
+    """
+    inicio = reglas.KM_VIA_INICIO.search(s)
+    return reglas.KM_VIA.match(s, inicio.start()) if inicio else None
 
 
-def standardize_address(address: str) -> str:
+def _manejar_km_via(s: str):
+    """
+    KM VÍA (formato: ... KM <numero> VIA/VEREDA ... CIUDAD ...): KM n [TIPO NUM].
+    """
+    km_match = _buscar_km_via(s)
+    if not km_match:
+        return None
+
+    # Es una dirección de KM VÍA
+    km_num = km_match.group(1)
+    resto_despues_km = km_match.group(2).strip()
+    
+    # Buscar el tipo de vía después del KM
+    via_match = reglas.KM_TIPO_VIA.search(resto_despues_km)
+    
+    if via_match:
+        via_type = normalize_via_type(via_match.group(1))
+        via_numero = via_match.group(2).strip().split()[0]  # Tomar solo el primer elemento
+        return DireccionNormalizada(via_type, via_numero, km=km_num, handler='km_via')
+    else:
+        # Solo KM + número, sin tipo de vía claro
+        return DireccionNormalizada(km=km_num, handler='km_via')
+
+
+def _manejar_con_nombre(s: str, posiciones_via: list):
+    """
+    PATRÓN ALTERNATIVO: TIPO_VIA + NOMBRE (1-3 palabras) + NUMEROS
+    Para casos como "AV CIRCUNVALAR 45 23" o "CL LA ROSITA 12 34"
+    """
+    match_nombre = buscar_en(reglas.PATRON_CON_NOMBRE, s, posiciones_via)
+    if not match_nombre:
+        return None
+
+    via_type = normalize_via_type(match_nombre.group(1))
+    num1 = match_nombre.group(2)
+    num2 = match_nombre.group(3)
+    num3 = match_nombre.group(4) if match_nombre.group(4) else ''
+    
+    return DireccionNormalizada(via_type, num1, num2=num2, num3=num3, handler='con_nombre')
+
+
+def _manejar_con_tipo(s: str, posiciones_via: list):
+    """
+    PATRÓN 1: Buscar TIPO_VIA explícito + NUMEROS (flexible con espacios)
+    Permite múltiples espacios y captura hasta 4 componentes numéricos
+    Ahora captura también direcciones cardinales (NORTE, SUR, ESTE, OESTE) que van después del número
+    Solo captura cardinales con al menos 3 letras (NOR, NORT, NORTE, etc.), no N/S/E/O solos
+    Permite direcciones con 1, 2 o 3 números
+    """
+    match = buscar_en(reglas.PATRON_CON_TIPO, s, posiciones_via)
+    if not match:
+        return None
+
+    via_type = normalize_via_type(match.group(1))
+    num1 = match.group(2)
+    direccion_cardinal = match.group(3).upper() if match.group(3) else ''
+    num2 = match.group(4) if match.group(4) else ''
+    num3 = match.group(5) if match.group(5) else ''
+    num4 = match.group(6) if match.group(6) else ''
+    
+    # VALIDACIÓN: Verificar que al menos el primer componente sea principalmente numérico
+    # Esto evita procesar "VEREDA EL PALMAR" como si fuera una dirección válida
+    has_numbers = reglas.DIGITO_INICIAL.match(num1)
+    if not has_numbers:
+        return None
+
+    # Normalizar dirección cardinal a su forma completa
+    direccion_cardinal = reglas.CARDINALES.get(direccion_cardinal, direccion_cardinal)
+
+    # Solo se conservan números consecutivos: NUM2, NUM2 NUM3 o NUM2 NUM3 NUM4
+    # (un solo número es válido para algunas direcciones)
+    if not (num2 and num3):
+        num4 = ''
+    if not num2:
+        num3 = ''
+    return DireccionNormalizada(via_type, num1, direccion_cardinal, num2, num3, num4, handler='con_tipo')
+
+
+def _manejar_numeros(s: str):
+    """
+    PATRÓN 2: Si no encuentra tipo explícito, busca al menos 2 bloques numéricos
+    pero SOLO si parecen direcciones, no coordenadas
+    """
+    match2 = reglas.PATRON_NUMEROS.search(s)
+    if not match2:
+        return None
+
+    num1 = match2.group(1)
+    num2 = match2.group(2)
+    num3 = match2.group(3) if match2.group(3) else ''
+    
+    # Solo retornar si:
+    # 1. Los primeros 2 componentes son principalmente numéricos
+    # 2. NO tienen más de 10 dígitos (eso sería datos raros/GPS)
+    if (reglas.DIGITO_INICIAL.match(num1) and reglas.DIGITO_INICIAL.match(num2) and
+        len(num1) <= 10 and len(num2) <= 10):
+        return DireccionNormalizada(num1=num1, num2=num2, num3=num3, handler='numeros')
+    return None
+
+
+def _intentar(perfil, nombre: str, manejador, *args):
+    """
+    Llama a un manejador; con perfil, registra la llamada. None = no aplica.
+    """
+    if perfil is None:
+        return manejador(*args)
+    return perfil.medir(nombre, manejador, *args)
+
+
+def _rechazar(perfil, motivo: str) -> DireccionNormalizada:
+    if perfil is not None:
+        perfil.rechazar(motivo)
+    return rechazada(motivo)
+
+
+def standardize_address(address: str, perfil: PerfilNormalizacion = None) -> str:
+    """
+    Estandariza una dirección colombiana a formato: TIPO NUM NUM [NUM].
+    Retorna '' si la dirección se rechaza. Es el texto de ``parse_address``.
+    """
+    return parse_address(address, perfil).texto
+
+
+def parse_address(address: str, perfil: PerfilNormalizacion = None) -> DireccionNormalizada:
     """
     Estandariza direcciones colombianas a formato: TIPO NUM NUM [NUM]
     Estrategia:
@@ -33,391 +379,632 @@ def standardize_address(address: str) -> str:
     4. Rechaza valores que parecen ser coordenadas GPS
     5. ESPECIAL: Normaliza KM VÍA manteniendo estructura base, eliminando complementos
     6. ESPECIAL: Normaliza direcciones de AUTOPISTAS (AUT, AUTO, etc.) manteniendo estructura
+
+    Retorna un ``DireccionNormalizada`` con los componentes, el manejador
+    (aeropuerto, via, autopista, km_via, con_nombre, con_tipo, numeros) y el
+    motivo de rechazo (vacia, coordenadas, autopista, sin_contenido, sin_patron).
+
+    Las reglas están precompiladas en ``reglas_normalizacion`` y se aplican por fases.
+    Con ``perfil`` se registran llamadas, coincidencias, tiempo y motivos de
+    rechazo por regla y por manejador.
     """
+    if perfil is not None:
+        perfil.direcciones += 1
+
     if pd.isna(address):
-        return ''
+        return _rechazar(perfil, 'vacia')
     
     s = str(address).strip()
     if not s or s.lower() in ['nan', '00', 'none', '']:
-        return ''
+        return _rechazar(perfil, 'vacia')
     
-    original = s
     s = s.upper()
     
-    # RECHAZO RÁPIDO: Si tiene muchas coordenadas GPS (patrones como "10.123456  74.654321")
-    # Pero primero intentar eliminarlas y procesar el resto si hay dirección válida
-    # Eliminar números decimales largos que parecen coordenadas GPS (5+ decimales)
-    s = re.sub(r'\b\d+\.\d{5,}\b', ' ', s)
-    
-    # También eliminar patrones de coordenadas con N/S/E/O/W
-    s = re.sub(r'\b\d+\.\d+\s*[NSEOW]\b', ' ', s, flags=re.IGNORECASE)
-    
-    # Compactar espacios después de eliminar coordenadas
-    s = re.sub(r'\s+', ' ', s).strip()
+    # RECHAZO RÁPIDO: eliminar coordenadas GPS (5+ decimales o con N/S/E/O/W)
+    # y procesar el resto si hay dirección válida
+    s = aplicar_fase(reglas.FASE_COORDENADAS, s, perfil).strip()
     
     # Si después de limpiar coordenadas no queda nada útil, rechazar
     if not s or len(s) < 3:
-        return ''
+        return _rechazar(perfil, 'coordenadas')
     
-    # ===== MANEJO ESPECIAL PARA AEROPUERTO =====
     # Normalizar errores de escritura de AEROPUERTO
-    s = re.sub(r'\b(AEREOPUERTO|AEREROPUERTO|AEROPUERTI|CARGO)\b', 'AEROPUERTO', s, flags=re.IGNORECASE)
-    
-    # Si la dirección contiene AEROPUERTO, tratarla especialmente
-    if 'AEROPUERTO' in s:
-        # Eliminar ciudades al inicio
-        s_aeropuerto = re.sub(r'^(ACACIAS|AGUACHICA|AGUAZUL|ANAPOIMA|ANSERMA|APARTADO|ARMENIA|BARANOA|BARBOSA|BARRANCABERMEJA|BARRANQUILLA|BELEN DE UMBRIA|BELLO|BOGOTA|BOLIVAR|BRICENO|BUCARAMANGA|BUENAVENTURA|BUGA|CAJICA|CALARCA|CALDAS|CALI|CAMPOALEGRE|CARTAGENA|CARTAGO|CAUCASIA|CERETE|CHAPARRAL|CHIA|CHINCHINA|CHIQUINQUIRA|CIENAGA|CODAZZI|COPACABANA|COTA|CUCUNUBA|CUCUTA|DOSQUEBRADAS|DUITAMA|ENVIGADO|ESPINAL|FACATATIVA|FLANDES|FLORENCIA|FLORIDA|FLORIDABLANCA|FUNDACION|FUNZA|FUSAGASUGA|GALAPA|GARZON|GIRARDOT|GIRARDOTA|GIRON|GRANADA|GUARNE|GUAYMARAL|IBAGUE|IPIALES|ITAGUI|JAMUNDI|LA CALERA|LA CEJA|LA DORADA|LA ESTRELLA|LA MESA|LA PINTADA|LA VEGA|LEBRIJA|MADRID|MALAMBO|MANIZALES|MANZANARES|MARINILLA|MARIQUITA|MARSELLA|MEDELLIN|MELGAR|MONTELIBANO|MONTENEGRO|MONTERIA|MONTERREY|MOSQUERA|NEIRA|NEIVA|OCANA|PAIPA|PALMIRA|PALONEGRO|PAMPLONA|PASTO|PEREIRA|PIEDECUESTA|PITALITO|PLANETA RICA|POPAYAN|PUERTO COLOMBIA|PUERTO GAITAN|PUERTO LOPEZ|QUIMBAYA|RIOHACHA|RIONEGRO|RIOSUCIO|RISARALDA|SABANALARGA|SABANETA|SALGAR|SAN GIL|SANTA BARBARA|SANTA MARIA|SANTA MARTA|SANTA ROSA DE CABAL|SANTANDER DE QUILICHAO|SIBATE|SINCELEJO|SOACHA|SOGAMOSO|SOLEDAD|SOPO|TENJO|TOCANCIPA|TULUÁ|TUNJA|TURBACO|TURBO|UBATE|URABA|VALLEDUPAR|VILLA DE LEYVA|VILLA DEL ROSARIO|VILLA MARIA|VILLAVICENCIO|VILLETA|YARUMAL|YUMBO|ZARAGOZA|ZIPAQUIRA)\s+', '', s, flags=re.IGNORECASE).strip()
-        # Eliminar adicionales como LOCAL, MUELLE, PISO, BODEGA, HANGAR, etc.
-        s_aeropuerto = re.sub(r'\b(LOCAL|LOCALES|L\d+|MUELLE|PISO|PISOS|P\d+|BODEGA|BODEGAS|BOD|HANGAR|OFICINA|OF|ZONA|SALA|PUERTA|GATE|TERMINAL|MODULO|MOD)\b.*$', '', s_aeropuerto, flags=re.IGNORECASE).strip()
-        # Compactar espacios
-        s_aeropuerto = re.sub(r'\s+', ' ', s_aeropuerto).strip()
-        if s_aeropuerto:
-            return s_aeropuerto
+    s = aplicar_fase(reglas.FASE_TIPOGRAFIA, s, perfil)
+
+    # ===== CLASIFICACIÓN =====
+    # Solo se prueban los manejadores especiales que pueden aplicar; la ciudad
+    # del inicio se separa una sola vez para todos ellos
+    clases = _clasificar(s)
+    ciudades = reglas.ESCANER.prefijos(s, CIUDAD) if clases & _USAN_CIUDAD else ()
+    sin_ciudad = s[ciudades[0]:] if ciudades else s
+
+    # ===== MANEJO ESPECIAL PARA AEROPUERTO =====
+    if clases & _AEROPUERTO:
+        resultado = _intentar(perfil, 'aeropuerto', _manejar_aeropuerto, s, sin_ciudad)
+        if resultado is not None:
+            return resultado
     
     # ===== MANEJO ESPECIAL PARA VIA =====
-    # Si la dirección contiene VIA (carreteras, rutas), mantener pero limpiar
-    if re.search(r'\bVIA\b', s, re.IGNORECASE):
-        # Eliminar ciudades al inicio
-        s_via = re.sub(r'^(ACACIAS|AGUACHICA|AGUAZUL|ANAPOIMA|ANSERMA|APARTADO|ARMENIA|BARANOA|BARBOSA|BARRANCABERMEJA|BARRANQUILLA|BELEN DE UMBRIA|BELLO|BOGOTA|BOLIVAR|BRICENO|BUCARAMANGA|BUENAVENTURA|BUGA|CAJICA|CALARCA|CALDAS|CALI|CAMPOALEGRE|CARTAGENA|CARTAGO|CAUCASIA|CERETE|CHAPARRAL|CHIA|CHINCHINA|CHIQUINQUIRA|CIENAGA|CODAZZI|COPACABANA|COTA|CUCUNUBA|CUCUTA|DOSQUEBRADAS|DUITAMA|ENVIGADO|ESPINAL|FACATATIVA|FLANDES|FLORENCIA|FLORIDA|FLORIDABLANCA|FUNDACION|FUNZA|FUSAGASUGA|GALAPA|GARZON|GIRARDOT|GIRARDOTA|GIRON|GRANADA|GUARNE|GUAYMARAL|IBAGUE|IPIALES|ITAGUI|JAMUNDI|LA CALERA|LA CEJA|LA DORADA|LA ESTRELLA|LA MESA|LA PINTADA|LA VEGA|LEBRIJA|MADRID|MALAMBO|MANIZALES|MANZANARES|MARINILLA|MARIQUITA|MARSELLA|MEDELLIN|MELGAR|MONTELIBANO|MONTENEGRO|MONTERIA|MONTERREY|MOSQUERA|NEIRA|NEIVA|OCANA|PAIPA|PALMIRA|PALONEGRO|PAMPLONA|PASTO|PEREIRA|PIEDECUESTA|PITALITO|PLANETA RICA|POPAYAN|PUERTO COLOMBIA|PUERTO GAITAN|PUERTO LOPEZ|QUIMBAYA|RIOHACHA|RIONEGRO|RIOSUCIO|RISARALDA|SABANALARGA|SABANETA|SALGAR|SAN GIL|SANTA BARBARA|SANTA MARIA|SANTA MARTA|SANTA ROSA DE CABAL|SANTANDER DE QUILICHAO|SIBATE|SINCELEJO|SOACHA|SOGAMOSO|SOLEDAD|SOPO|TENJO|TOCANCIPA|TULUÁ|TUNJA|TURBACO|TURBO|UBATE|URABA|VALLEDUPAR|VILLA DE LEYVA|VILLA DEL ROSARIO|VILLA MARIA|VILLAVICENCIO|VILLETA|YARUMAL|YUMBO|ZARAGOZA|ZIPAQUIRA)\s+', '', s, flags=re.IGNORECASE).strip()
-        # Eliminar adicionales como LOCAL, MUELLE, PISO, BODEGA, etc. y todo lo que viene después
-        s_via = re.sub(r'\b(LOCAL|LOCALES|L\d+|MUELLE|PISO|PISOS|P\d+|BODEGA|BODEGAS|BOD|HANGAR|OFICINA|OF|ZONA|SALA|PUERTA|GATE|TERMINAL|MODULO|MOD|LOTE|SECTOR|COORDENADAS|UBICADO|UBICADA)\b.*$', '', s_via, flags=re.IGNORECASE).strip()
-        # Compactar espacios
-        s_via = re.sub(r'\s+', ' ', s_via).strip()
-        if s_via and len(s_via) > 3:  # Evitar retornar solo "VIA"
-            return s_via
+    if clases & _VIA:
+        resultado = _intentar(perfil, 'via', _manejar_via, s, sin_ciudad)
+        if resultado is not None:
+            return resultado
     
     # ===== MANEJO ESPECIAL PARA AUTOPISTAS =====
-    # Detectar si comienza con AUT, AUTO, AUT., AUTOMÁTICO, etc.
-    # Manejo especial para variantes: AUTO (con espacio), AUTOXXXXXX (pegado), AUTONORTE, etc.
-    
-    # Primero eliminar ciudades al inicio si van seguidas de autopista
-    s = re.sub(r'^(ACACIAS|AGUACHICA|AGUAZUL|ANAPOIMA|ANSERMA|APARTADO|ARMENIA|BARANOA|BARBOSA|BARRANCABERMEJA|BARRANQUILLA|BELEN DE UMBRIA|BELLO|BOGOTA|BOLIVAR|BRICENO|BUCARAMANGA|BUENAVENTURA|BUGA|CAJICA|CALARCA|CALDAS|CALI|CAMPOALEGRE|CARTAGENA|CARTAGO|CAUCASIA|CERETE|CHAPARRAL|CHIA|CHINCHINA|CHIQUINQUIRA|CIENAGA|CODAZZI|COPACABANA|COTA|CUCUNUBA|CUCUTA|DOSQUEBRADAS|DUITAMA|ENVIGADO|ESPINAL|FACATATIVA|FLANDES|FLORENCIA|FLORIDA|FLORIDABLANCA|FUNDACION|FUNZA|FUSAGASUGA|GALAPA|GARZON|GIRARDOT|GIRARDOTA|GIRON|GRANADA|GUARNE|GUAYMARAL|IBAGUE|IPIALES|ITAGUI|JAMUNDI|LA CALERA|LA CEJA|LA DORADA|LA ESTRELLA|LA MESA|LA PINTADA|LA VEGA|LEBRIJA|MADRID|MALAMBO|MANIZALES|MANZANARES|MARINILLA|MARIQUITA|MARSELLA|MEDELLIN|MELGAR|MONTELIBANO|MONTENEGRO|MONTERIA|MONTERREY|MOSQUERA|NEIRA|NEIVA|OCANA|PAIPA|PALMIRA|PALONEGRO|PAMPLONA|PASTO|PEREIRA|PIEDECUESTA|PITALITO|PLANETA RICA|POPAYAN|PUERTO COLOMBIA|PUERTO GAITAN|PUERTO LOPEZ|QUIMBAYA|RIOHACHA|RIONEGRO|RIOSUCIO|RISARALDA|SABANALARGA|SABANETA|SALGAR|SAN GIL|SANTA BARBARA|SANTA MARIA|SANTA MARTA|SANTA ROSA DE CABAL|SANTANDER DE QUILICHAO|SIBATE|SINCELEJO|SOACHA|SOGAMOSO|SOLEDAD|SOPO|TENJO|TOCANCIPA|TULUÁ|TUNJA|TURBACO|TURBO|UBATE|URABA|VALLEDUPAR|VILLA DE LEYVA|VILLA DEL ROSARIO|VILLA MARIA|VILLAVICENCIO|VILLETA|YARUMAL|YUMBO|ZARAGOZA|ZIPAQUIRA)\s+(?=(?:AUTOPISTA|AUT\.?|AUTO(?:P|PISTA)?|AUTO[A-Z]+|AUT[A-Z]+))', '', s, flags=re.IGNORECASE).strip()
-    
-    # Luego limpiar errores de escritura: AUTO PISTA -> AUTO, AUTOP -> AUTO
-    s = re.sub(r'\bAUTO\s+PISTA\b', 'AUTO', s, flags=re.IGNORECASE)
-    s = re.sub(r'\bAUTOP\b', 'AUTO', s, flags=re.IGNORECASE)
-    
-    # Eliminar N cuando significa NUMERO (está entre números)
+    # Eliminar ciudades al inicio si van seguidas de autopista y corregir
+    # AUTO PISTA / AUTOP -> AUTO
+    if clases & _AUTOPISTA:
+        inicio = desde_prefijo(s, ciudades, 'AUT')
+        if inicio >= 0:
+            s = s[inicio:]
+        s = aplicar_fase(reglas.FASE_PREVIA_AUTOPISTA, s, perfil)
+
+    # Eliminar N/S/E/O solos entre números
     # Ejemplo: "AK 72 N 80 94" -> "AK 72 80 94"
-    # Solo eliminar N, S, E, O solos (no NORTE, NOR, NORT, SUR, ESTE, OESTE)
-    s = re.sub(r'\b([0-9]+)\s+([NSEO])\s+([0-9]+)', r'\1 \3', s)
+    s = aplicar_fase(reglas.FASE_ENTRE_NUMEROS, s, perfil)
     
-    # Detectar si es una autopista (AUT, AUTO, AUTOPISTA)
-    aut_check = re.match(r'^(?:AUTOPISTA|AUT\.?|AUTO(?:PISTA)?\.?|AUTO[A-Z]+|AUT[A-Z]+)', s, re.IGNORECASE)
-    
-    if aut_check:
-        # Es una dirección de autopista
-        aut_name = None
-        resto_aut = None
-        
-        # Primer intento: capturar AUTOPISTA. o AUT. o AUTO. (con punto o palabra completa)
-        prefijo_match = re.match(r'^(AUTOPISTA\.?|AUT\.|AUTO\.)\s*(.+)$', s, re.IGNORECASE)
-        if prefijo_match:
-            resto_aut = prefijo_match.group(2).strip()
-        else:
-            # Segundo intento: capturar AUTO[PALABRAS] o AUT[PALABRAS] (pegado sin espacios)
-            prefijo_match = re.match(r'^(AUTO[A-Z]+|AUT[A-Z]+)\s*(.+)?$', s, re.IGNORECASE)
-            if prefijo_match:
-                aut_prefix = prefijo_match.group(1)
-                resto_aut = prefijo_match.group(2)
-                
-                # Extraer el nombre de la autopista desde el prefijo pegado
-                # Ej: AUTONORTE -> NORTE, AUTOMEDELLIN -> MEDELLIN, AUTOMED -> MED
-                if aut_prefix.upper().startswith('AUTO'):
-                    aut_name = aut_prefix[4:]  # Quitar "AUTO"
-                elif aut_prefix.upper().startswith('AUT'):
-                    aut_name = aut_prefix[3:]  # Quitar "AUT"
-                
-                # Si no hay resto, solo retornar el nombre de la autopista
-                if not resto_aut:
-                    return f"AUTOPISTA {aut_name}"
-            else:
-                # Tercer intento: capturar AUTOPISTA o AUTO o AUT seguido de espacio
-                prefijo_match = re.match(r'^(AUTOPISTA|AUTO|AUT)\s+(.+)$', s, re.IGNORECASE)
-                if prefijo_match:
-                    resto_aut = prefijo_match.group(2).strip()
-        
-        # Si tenemos resto_aut pero no aut_name (casos con espacio), extraer el nombre
-        if resto_aut and not aut_name:
-            # Extraer solo la primera palabra como nombre de la autopista
-            palabras = resto_aut.split()
-            if palabras:
-                aut_name = palabras[0]
-                resto_aut = ' '.join(palabras[1:]) if len(palabras) > 1 else ''
-        
-        # Si tenemos resto_aut, procesarlo
-        if resto_aut:
-            # Si no tenemos aut_name, extraerlo de resto_aut
-            if not aut_name:
-                # Buscar patrón de KM primero para extraer el nombre
-                km_in_aut_pattern = re.compile(r'^(.+?)(?:KM|K\.M\.?|KILOMETRO)\s*(\d+[.\d]*)\s*(.+)?', re.IGNORECASE)
-                km_in_aut = km_in_aut_pattern.search(resto_aut)
-                
-                if km_in_aut:
-                    aut_name = km_in_aut.group(1).strip()
-                else:
-                    # Extraer primeras palabras como nombre
-                    nombre_pattern = re.compile(r'^([A-Z]+(?:\s+[A-Z]+)?)(?:\s+|$)', re.IGNORECASE)
-                    nombre_match = nombre_pattern.match(resto_aut)
-                    aut_name = nombre_match.group(1).strip() if nombre_match else resto_aut
-            
-            # Buscar patrón de KM dentro (incluyendo casos como "4KM" sin espacio)
-            km_in_aut_pattern = re.compile(r'(?:(\d+)\s*(?:KM|K\.M\.?|KILOMETRO)|(?:KM|K\.M\.?|KILOMETRO)\s*(\d+[.\d]*))\s*(.+)?', re.IGNORECASE)
-            km_in_aut = km_in_aut_pattern.search(resto_aut)
-            
-            if km_in_aut:
-                # Tiene formato: [NOMBRE_AUTOPISTA] KM [numero] [resto]
-                km_num = km_in_aut.group(1) if km_in_aut.group(1) else km_in_aut.group(2)
-                resto_km = km_in_aut.group(3).strip() if km_in_aut.group(3) else ''
-                
-                # Limpiar resto_km de descriptivos
-                resto_km = re.sub(r'\b(BOGOTA|CALI|MEDELLIN|LOCAL|BODEGA|PISO|PARQUE|COSTADO|GLORIETA|SIBERIA|PARCELAS)\b', '', resto_km, flags=re.IGNORECASE).strip()
-                resto_km = re.sub(r'\s+', ' ', resto_km).strip()
-                
-                # Buscar tipo de vía en lo que sigue después del KM
-                if resto_km:
-                    via_pattern = re.compile(r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TRAVERSAL|TRANVERSAL|TRANSVERSA|TRANSVERAL|TRANSVESAL|TV|TRANSV|TR|AC|ACL|ACR|PASAJE|PAS|PASEO|VEREDA|VDA|VIA)\b', re.IGNORECASE)
-                    via_match = via_pattern.search(resto_km)
-                    
-                    if via_match:
-                        via_type = normalize_via_type(via_match.group(1))
-                        return f"AUTOPISTA {aut_name} KM {km_num} {via_type}"
-                    else:
-                        return f"AUTOPISTA {aut_name} KM {km_num}"
-                else:
-                    return f"AUTOPISTA {aut_name} KM {km_num}"
-            else:
-                # No tiene KM, buscar si tiene números o tipo de vía
-                # Eliminar complementos y descriptivos del resto (múltiples pasadas)
-                resto_limpio = resto_aut
-                
-                # Primera pasada: eliminar todas las palabras descriptivas
-                descriptivos_aut = r'\b(NO|N|NUM|NR|NUMERO|GLORIETA|SIBERIA|CENTRO|COMERCIAL|EMPRESARIAL|ENTRADA|COSTADO|INTERIOR|CRUCE|CONECTOR|BOGOTA|CALI|MEDELLIN|LOCAL|BODEGA|PISO|ZONA|OFICINA|LOTE|MODULO|BD|BOD|BG|OFC|LC|LOC|ENT|INT|PARQUE|BODEGAS|TERMINALES?|COORDEN|COORD|SOBRE|VEREDA|SUR|NORTE|ESTE|OESTE)\b'
-                for _ in range(2):  # Dos pasadas para asegurar limpieza
-                    resto_limpio = re.sub(descriptivos_aut, ' ', resto_limpio, flags=re.IGNORECASE)
-                
-                resto_limpio = resto_limpio.strip()
-                resto_limpio = re.sub(r'\s+', ' ', resto_limpio).strip()
-                
-                # Reemplazar símbolos por espacios
-                resto_limpio = re.sub(r'[#\-\.]+', ' ', resto_limpio)
-                resto_limpio = re.sub(r'\s+', ' ', resto_limpio).strip()
-                
-                # Buscar patrón: [TIPO] [num] [num] o directamente números
-                if resto_limpio:
-                    via_pattern = re.compile(r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TRAVERSAL|TRANVERSAL|TRANSVERSA|TRANSVERAL|TRANSVESAL|TV|TRANSV|TR|AC|ACL|ACR|PASAJE|PAS|PASEO)\s+([A-Z0-9]+)\s+([A-Z0-9]+)', re.IGNORECASE)
-                    via_match = via_pattern.search(resto_limpio)
-                    
-                    if via_match:
-                        via_type = normalize_via_type(via_match.group(1))
-                        num1 = via_match.group(2).strip().split()[0]
-                        num2 = via_match.group(3).strip().split()[0]
-                        return f"AUTOPISTA {aut_name} {via_type} {num1} {num2}"
-                    else:
-                        # Buscar solo números
-                        numeros = re.findall(r'\b\d+(?:[A-Z]?)(?:\.\d+)?\b', resto_limpio)
-                        if len(numeros) >= 2:
-                            return f"AUTOPISTA {aut_name} {numeros[0]} {numeros[1]}"
-                        elif len(numeros) == 1:
-                            return f"AUTOPISTA {aut_name} {numeros[0]}"
-            
-            # Si llegamos aquí sin retornar, solo retornar el nombre de la autopista
-            return f"AUTOPISTA {aut_name}" if aut_name else ""
+    if clases & _AUTOPISTA:
+        resultado = _intentar(perfil, 'autopista', _manejar_autopista, s)
+        if resultado is not None:
+            return resultado
     
     # ===== MANEJO ESPECIAL PARA KM VÍA =====
-    # Detectar si es una dirección de KM VÍA (formato: ... KM <numero> VIA/VEREDA ... CIUDAD ...)
-    km_pattern = re.compile(r'^(.*?)(?:KM|K\.M\.?|KILOMETRO)\s+(\d+[.\d]*)\s+(.+?)(?=\s+(?:BOGOTA|MEDELLIN|CALI|BARRANQUILLA|LOCAL|PISO|APT|OFICINA|BODEGA|ZONA|SOTANO|$))', re.IGNORECASE)
-    km_match = km_pattern.search(s)
-    
-    if km_match:
-        # Es una dirección de KM VÍA
-        km_num = km_match.group(2)
-        resto_despues_km = km_match.group(3).strip()
-        
-        # Buscar el tipo de vía después del KM
-        via_pattern = re.compile(r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TRAVERSAL|TRANVERSAL|TRANSVERSA|TRANSVERAL|TRANSVESAL|TV|TRANSV|TR|AC|ACL|ACR|PASAJE|PAS|PASEO|VEREDA|VDA|VIA)\s+(.+)', re.IGNORECASE)
-        via_match = via_pattern.search(resto_despues_km)
-        
-        if via_match:
-            via_type = normalize_via_type(via_match.group(1))
-            via_numero = via_match.group(2).strip().split()[0]  # Tomar solo el primer elemento
-            return f"KM {km_num} {via_type} {via_numero}"
-        else:
-            # Solo KM + número, sin tipo de vía claro
-            return f"KM {km_num}"
+    if clases & _KM_VIA:
+        resultado = _intentar(perfil, 'km_via', _manejar_km_via, s)
+        if resultado is not None:
+            return resultado
     
     # ===== NORMALIZACIÓN PREVIA DE PATRONES COMPLEJOS =====
     
-    # Eliminar teléfonos (secuencias de 7+ dígitos)
-    s = re.sub(r'\b\d{7,}\b', ' ', s)
-    
-    # Eliminar números muy largos que no son direcciones (más de 6 dígitos consecutivos)
-    s = re.sub(r'\b\d{7,}\b', ' ', s)
-    
-    # Separar tipos de vía pegados: AVCL -> AV CL, AKCL -> AK CL, CRCL -> CR CL
-    s = re.sub(r'\b(AV|AK|CR|CL|KR|TV|DG)(CL|CR|KR|AV|AK)\b', r'\1 \2', s, flags=re.IGNORECASE)
-    
-    # Separar letras pegadas a números en direcciones: CR77MSUR -> CR 77M SUR
-    s = re.sub(r'(CR|CL|AV|KR|AK|TV|DG)(\d)', r'\1 \2', s, flags=re.IGNORECASE)
-    
-    # Separar números con letras pegadas: 5B3 -> 5B 3, 15A61 -> 15A 61
-    s = re.sub(r'(\d+[A-Z])(\d)', r'\1 \2', s)
-    
-    # Separar direcciones con letra+SUR/NORTE pegado: 77MSUR -> 77M SUR, 32BNORTE -> 32B NORTE
-    s = re.sub(r'(\d+[A-Z]?)(SUR|NORTE|ESTE|OESTE)', r'\1 \2', s, flags=re.IGNORECASE)
-    
-    # Normalizar "B SUR" a "BIS SUR" para consistencia
-    s = re.sub(r'\b(\d+[A-Z]?)\s+B\s+(SUR|NORTE|ESTE|OESTE)\b', r'\1 BIS \2', s, flags=re.IGNORECASE)
-    
-    # Reemplazar símbolos comunes por espacios
-    s = re.sub(r'[#\-,;.()]+', ' ', s)
-    
-    # Eliminar tipos de vía duplicados: mantener solo el que está antes de números
-    # Si hay "CALLE AVENIDA 3", queremos mantener el tipo que precede al número
-    # Patrón: TIPO_VIA TIPO_VIA NUMERO -> TIPO_VIA NUMERO (eliminar el tipo intermedio)
-    via_types_pattern = r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TV|TRANSV|TR)\s+(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TV|TRANSV|TR)\s+(\d)'
-    # Mantener primer tipo y el número
-    s = re.sub(via_types_pattern, r'\1 \3', s, flags=re.IGNORECASE)
+    # Eliminar teléfonos y números muy largos (7+ dígitos consecutivos)
+    s = aplicar_fase(reglas.FASE_RUIDO, s, perfil)
     
-    # Eliminar números que parecen coordenadas GPS (muchos decimales)
-    s = re.sub(r'\b\d+\.\d{5,}\b', ' ', s)
+    # Separar tipos de vía pegados (AVCL -> AV CL), letras pegadas a números
+    # (CR77MSUR -> CR 77M SUR, 5B3 -> 5B 3), normalizar "B SUR" a "BIS SUR",
+    # reemplazar símbolos por espacios y eliminar tipos de vía duplicados
+    s = aplicar_fase(reglas.FASE_SEPARACION, s, perfil)
     
-    # Reemplazar variaciones de "No." o "Nº"
-    s = re.sub(r'\b(N[OÓº°]|NO|NR|NUM)\b', ' ', s, flags=re.IGNORECASE)
-    
-    # Eliminar palabras descriptivas - ACTUALIZADO: Mantener NORTE/SUR/ESTE/OESTE si están entre números
-    descriptivos = r'\b(LOCAL|LOCALES|L\d+|CENTRO|COMERCIAL|COMERCIAR|PISO|PISOS|APTO|APT|APARTAMENTO|OFICINA|OF|OFC|OFI|INTERIOR|INT|BODEGA|BOD|BODEGAS|CASA|EDIFICIO|ED|ATRIO|TORRE|TO|BLOQUE|BL|BLQ|MZ|MANZANA|BARRIO|CONJUNTO|CONJ|ETAPA|PARQUE|TERMINAL|PUENTE|AEREO|COSTADO|FRENTE|ESQUINA|ESQ|LAS|LOS|LA|LD|LOTE|LOTES|FASE|MODULO|MOD|SUBLOTE|SECTOR|SECT|SECCION|KM|KILOMETRO|KILOMETROS|DEL|DE|EN|BODEGAS|ARTURO|CUMPLIDO|TOLU|PARCELAS|COTA|ES|DIRECCION|DIR|A|MTS|METROS|ADELANTE|PEAJE|PUERTAS|DON|DIEGO|LLANOGRANDE|ACACIAS|RANSA|COLFRIGOS|SUBA|CALI|MIECO|ERNESTO|CORTIZZOS|CAMILA|DAZA|ADMINISTRATIVO|NRO|TRADE|PARK|SIBERIA|VIAL|BRICENO|PALERMO|ANILLO|VEREDA|VDA|GIRON|VIA|AUTOPISTA|LC|LOC|LI|DG|BA|CD|PI|PZ|BIS|BD|AL|TRV|BOG|PS|LT|LO|IN|AP|CON|AN|BDG|PAGINA|LINCA|NIVEL|ACOPI|ACTUAL|SOLEDAD|AGOSTO|POR|ENTRE|EDIF|ANTIOQUIA|ATLANTICO|DORADO|BOYACA|AMERICAS|BOLIVAR|MULTIPLAZA|ROSITA|BURBUJA|TAQUILLA|SEDE|ADM|ADMINISTRACION|FINCA|ZONA|FRANCA|COMPLEJO|INDUSTRIAL|LOGISTICO|PARQUEADERO|ENTRADA)\b'
-    s = re.sub(descriptivos, ' ', s, flags=re.IGNORECASE)
-    
-    # Eliminar ciudades/lugares y departamentos
-    ciudades = r'\b(ACACIAS|AGUACHICA|AGUAZUL|ANAPOIMA|ANSERMA|APARTADO|ARMENIA|BARANOA|BARBOSA|BARRANCABERMEJA|BARRANQUILLA|BELEN DE UMBRIA|BELLO|BOGOTA|BOLIVAR|BRICENO|BUCARAMANGA|BUENAVENTURA|BUGA|CAJICA|CALARCA|CALDAS|CALI|CAMPOALEGRE|CARTAGENA|CARTAGO|CAUCASIA|CERETE|CHAPARRAL|CHIA|CHINCHINA|CHIQUINQUIRA|CIENAGA|CODAZZI|COPACABANA|COTA|CUCUNUBA|CUCUTA|DOSQUEBRADAS|DUITAMA|ENVIGADO|ESPINAL|FACATATIVA|FLANDES|FLORENCIA|FLORIDA|FLORIDABLANCA|FUNDACION|FUNZA|FUSAGASUGA|GALAPA|GARZON|GIRARDOT|GIRARDOTA|GIRON|GRANADA|GUARNE|GUAYMARAL|IBAGUE|IPIALES|ITAGUI|JAMUNDI|LA CALERA|LA CEJA|LA DORADA|LA ESTRELLA|LA MESA|LA PINTADA|LA VEGA|LEBRIJA|MADRID|MALAMBO|MANIZALES|MANIZALEZ|MANZANARES|MARINILLA|MARIQUITA|MARSELLA|MEDELLIN|MELGAR|MONTELIBANO|MONTENEGRO|MONTERIA|MONTERREY|MOSQUERA|NEIRA|NEIVA|OCANA|PAIPA|PALMIRA|PALONEGRO|PAMPLONA|PASTO|PEREIRA|PIEDECUESTA|PITALITO|PLANETA RICA|POPAYAN|PUERTO COLOMBIA|PUERTO GAITAN|PUERTO LOPEZ|QUIMBAYA|RIOHACHA|RIONEGRO|RIOSUCIO|RISARALDA|SABANALARGA|SABANETA|SALGAR|SAN GIL|SANTA BARBARA|SANTA MARIA|SANTA MARTA|SANTA ROSA DE CABAL|SANTANDER DE QUILICHAO|SIBATE|SINCELEJO|SOACHA|SOGAMOSO|SOLEDAD|SOPO|TENJO|TOCANCIPA|TULUÁ|TUNJA|TURBACO|TURBO|UBATE|URABA|VALLEDUPAR|VILLA DE LEYVA|VILLA DEL ROSARIO|VILLA MARIA|VILLAVICENCIO|VILLETA|YARUMAL|YOPAL|YUMBO|ZARAGOZA|ZIPAQUIRA|AEROPUERTO|ANTIOQUIA|ATLANTICO|CUNDINAMARCA|VALLE|SANTANDER|CASANARE)\b'
-    s = re.sub(ciudades, ' ', s, flags=re.IGNORECASE)
-    
-    # Compactar espacios
-    s = re.sub(r'\s+', ' ', s).strip()
+    # Eliminar variaciones de "No.", palabras descriptivas, ciudades y departamentos
+    s = aplicar_fase(reglas.FASE_DESCRIPTIVOS, s, perfil).strip()
     
     if not s or len(s) < 1:
-        return ''
-    
-    # PATRÓN ALTERNATIVO: TIPO_VIA + NOMBRE (1-3 palabras) + NUMEROS
-    # Para casos como "AV CIRCUNVALAR 45 23" o "CL LA ROSITA 12 34"
-    pattern_con_nombre = r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TV|TRANSV|TR)\s+(?:[A-Z]+\s+){1,3}?(\d+[A-Z]?)\s+(\d+[A-Z]?)(?:\s+(\d+[A-Z]?))?'
-    match_nombre = re.search(pattern_con_nombre, s, re.IGNORECASE)
-    
-    if match_nombre:
-        via_type = normalize_via_type(match_nombre.group(1))
-        num1 = match_nombre.group(2)
-        num2 = match_nombre.group(3)
-        num3 = match_nombre.group(4) if match_nombre.group(4) else ''
-        
-        if num3:
-            return f"{via_type} {num1} {num2} {num3}"
-        else:
-            return f"{via_type} {num1} {num2}"
+        return _rechazar(perfil, 'sin_contenido')
     
-    # PATRÓN 1: Buscar TIPO_VIA explícito + NUMEROS (flexible con espacios)
-    # Permite múltiples espacios y captura hasta 4 componentes numéricos
-    # Ahora captura también direcciones cardinales (NORTE, SUR, ESTE, OESTE) que van después del número
-    # Solo captura cardinales con al menos 3 letras (NOR, NORT, NORTE, etc.), no N/S/E/O solos
-    # Permite direcciones con 1, 2 o 3 números
-    pattern_con_tipo = r'\b(CALLE|CLL|CL|CALL|CARRERA|CRA|KRA|KR|AK|K|AVENIDA|AENIDA|AV|AVD|AVDA|AVE|DIAGONAL|DG|DIAG|TRANSVERSAL|TRAVERSAL|TRANVERSAL|TRANSVERSA|TRANSVERAL|TRANSVESAL|TV|TRANSV|TR|AC|ACL|ACR|CIRCULAR|CIRC|PASAJE|PAS|PASEO|PEATONAL|PTE|PERIF|CTRA|VEREDA|VDA|VIA)\s+([A-Z0-9]+)(?:\s+(NORTE|NOR|NORT|SUR|ESTE|OESTE|OCCIDENTE|OCC))?(?:\s+([A-Z0-9]+))?(?:\s+([A-Z0-9]+))?(?:\s+([A-Z0-9]+))?'
+    # Los patrones con tipo de vía solo pueden empezar en una palabra de tipo de vía
+    posiciones_via = reglas.ESCANER.posiciones(s, TIPO_VIA)
     
-    match = re.search(pattern_con_tipo, s, re.IGNORECASE)
+    for nombre, manejador, args in (
+        ('con_nombre', _manejar_con_nombre, (s, posiciones_via)),
+        ('con_tipo', _manejar_con_tipo, (s, posiciones_via)),
+        ('numeros', _manejar_numeros, (s,)),
+    ):
+        resultado = _intentar(perfil, nombre, manejador, *args)
+        if resultado is not None:
+            return resultado
     
-    if match:
-        via_type = normalize_via_type(match.group(1))
-        num1 = match.group(2)
-        direccion_cardinal = match.group(3).upper() if match.group(3) else None
-        num2 = match.group(4) if match.group(4) else ''
-        num3 = match.group(5) if match.group(5) else ''
-        num4 = match.group(6) if match.group(6) else ''
-        
-        # VALIDACIÓN: Verificar que al menos el primer componente sea principalmente numérico
-        # Esto evita procesar "VEREDA EL PALMAR" como si fuera una dirección válida
-        has_numbers = re.match(r'\d', num1)
-        
-        if has_numbers:
-            # Construir resultado con dirección cardinal si existe
-            if direccion_cardinal:
-                # Normalizar dirección cardinal a su forma completa
-                if direccion_cardinal in ['NOR', 'NORT', 'NORTE']:
-                    direccion_cardinal = 'NORTE'
-                elif direccion_cardinal in ['SUR']:
-                    direccion_cardinal = 'SUR'
-                elif direccion_cardinal in ['ESTE']:
-                    direccion_cardinal = 'ESTE'
-                elif direccion_cardinal in ['OESTE', 'OCCIDENTE', 'OCC']:
-                    direccion_cardinal = 'OESTE'
-                
-                # Retornar con dirección cardinal
-                if num2 and num3 and num4:
-                    return f"{via_type} {num1} {direccion_cardinal} {num2} {num3} {num4}"
-                elif num2 and num3:
-                    return f"{via_type} {num1} {direccion_cardinal} {num2} {num3}"
-                elif num2:
-                    return f"{via_type} {num1} {direccion_cardinal} {num2}"
-                else:
-                    return f"{via_type} {num1} {direccion_cardinal}"
-            else:
-                # Retornar con los números disponibles
-                if num2 and num3 and num4:
-                    return f"{via_type} {num1} {num2} {num3} {num4}"
-                elif num2 and num3:
-                    return f"{via_type} {num1} {num2} {num3}"
-                elif num2:
-                    return f"{via_type} {num1} {num2}"
-                else:
-                    # Solo un número - válido para algunas direcciones
-                    return f"{via_type} {num1}"
-    
-    # PATRÓN 2: Si no encuentra tipo explícito, busca al menos 2 bloques numéricos
-    # pero SOLO si parecen direcciones, no coordenadas
-    pattern_numeros = r'^([A-Z0-9]+)\s+([A-Z0-9]+)(?:\s+([A-Z0-9]+))?'
-    match2 = re.search(pattern_numeros, s)
-    
-    if match2:
-        num1 = match2.group(1)
-        num2 = match2.group(2)
-        num3 = match2.group(3) if match2.group(3) else ''
-        
-        # Solo retornar si:
-        # 1. Los primeros 2 componentes son principalmente numéricos
-        # 2. NO tienen más de 10 dígitos (eso sería datos raros/GPS)
-        if (re.match(r'\d', num1) and re.match(r'\d', num2) and
-            len(num1) <= 10 and len(num2) <= 10):
-            if num3:
-                return f"{num1} {num2} {num3}"
-            else:
-                return f"{num1} {num2}"
-    
-    return ''
+    return _rechazar(perfil, 'sin_patron')
+
+
+def rules_version() -> str:
+    """
+    Huella del conjunto de reglas: hash del código completo de este módulo, de
+    los módulos de reglas, del escáner, de resultado y de la cache (que define
+    la clave del almacén), y de las tablas de reglas_normalizacion.json. Cambia
+    con cualquier modificación de esos archivos (también las que no cambian
+    resultados) e invalida los almacenes persistentes.
+    """
+    huella = hashlib.sha256()
+    # Módulos completos: una lista de funciones se queda corta al agregar una nueva
+    for modulo in (sys.modules[__name__], reglas, escaner_palabras, resultado_normalizacion, cache_normalizacion):
+        huella.update(inspect.getsource(modulo).encode('utf-8'))
+    with open(reglas.RUTA_TABLAS, 'rb') as f:
+        huella.update(f.read())
+    return huella.hexdigest()[:16]
+
+
+def _standardize_chunk(addresses: list) -> list:
+    return [standardize_address(address) for address in addresses]
+
+
+def _standardize_chunk_medido(clase_perfil, limites: LimitesNormalizacion, addresses: list) -> tuple:
+    """
+    Lote con perfil (uno nuevo de clase_perfil, si no es None) y/o límites;
+    retorna (resultados, perfil, limites).
+    """
+    perfil = clase_perfil() if clase_perfil is not None else None
+    if limites is None:
+        return [standardize_address(address, perfil) for address in addresses], perfil, None
+
+    def rechazar(motivo: str) -> str:
+        # Una dirección larga no llega a standardize_address
+        if perfil is not None and motivo == 'larga':
+            perfil.direcciones += 1
+        return _rechazar(perfil, motivo).texto
+
+    # Construir las reglas antes de medir, para no cargarlas al presupuesto de la primera fila
+    reglas.precargar()
+    resultados = limites.normalizar_lote(addresses, lambda address: standardize_address(address, perfil), rechazar)
+    return resultados, perfil, limites
 
 
-def main():
-    input_file = "Nits_ciudad.xlsx"
-    output_file = "Nits_ciudad_normalizadas.xlsx"
-    column_name = "Direccion"  # cambia si tu columna tiene otro nombre
+def _parse_chunk(addresses: list) -> list:
+    # Tuplas simples: se envían entre procesos más livianas que los registros
+    return [tuple(parse_address(address)) for address in addresses]
 
-    # Validar que el archivo de entrada existe
-    if not os.path.exists(input_file):
-        raise FileNotFoundError(f"El archivo de entrada no existe: {input_file}")
 
-    print(f"Leyendo archivo: {input_file}")
-    df = pd.read_excel(input_file)
+def _repartir(procesar_lote, addresses: list, workers: int, chunk_size: int, executor=None) -> list:
+    """
+    Aplica procesar_lote a la entrada en lotes de chunk_size, en un pool de procesos
+    si workers > 1 y la entrada es grande, y retorna los resultados de cada lote en orden.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if chunk_size < 1:
+        raise ValueError("El tamaño de lote debe ser al menos 1.")
+
+    chunks = [addresses[i:i + chunk_size] for i in range(0, len(addresses), chunk_size)]
+    if workers <= 1 or len(chunks) < 2 or len(addresses) < MINIMO_PARALELO:
+        return [procesar_lote(addresses)]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            return list(executor.map(procesar_lote, chunks))
+    # map() conserva el orden de los lotes
+    return list(executor.map(procesar_lote, chunks))
+
+
+def standardize_batch(addresses, workers: int = 1, chunk_size: int = TAMANO_LOTE, executor=None,
+                      cache: CacheNormalizacion = None, store: AlmacenNormalizacion = None,
+                      perfil: PerfilNormalizacion = None, limites: LimitesNormalizacion = None) -> list:
+    """
+    Estandariza una secuencia de direcciones y retorna los resultados en el mismo orden.
+    Con workers > 1 divide la entrada en lotes de chunk_size y los reparte en un pool
+    de procesos (executor, si se pasa uno ya creado); workers = 0 usa todos los núcleos.
+    Entradas pequeñas se procesan en serie. Con cache, cada dirección distinta se
+    normaliza una sola vez y los resultados se reutilizan entre llamadas. Con store,
+    solo se normalizan las direcciones que no están en el almacén persistente.
+    Con perfil se acumulan las estadísticas de las direcciones efectivamente
+    normalizadas (también las de los procesos del pool). Con limites (modo
+    blindado) cada dirección tiene una longitud máxima y un presupuesto de
+    tiempo, y las que los exceden se rechazan y quedan registradas.
+    """
+    if cache is not None:
+        return cache.normalizar_lote(
+            addresses,
+            lambda pendientes: standardize_batch(pendientes, workers, chunk_size, executor, store=store,
+                                                 perfil=perfil, limites=limites)
+        )
+    if store is not None:
+        resultados = store.normalizar_lote(
+            addresses, lambda pendientes: standardize_batch(pendientes, workers, chunk_size, executor,
+                                                            perfil=perfil, limites=limites)
+        )
+        # Los rechazos por límites dependen de la configuración, no de las reglas
+        if limites is not None and limites.excedidas:
+            store.descartar(limites.excedidas)
+        return resultados
+
+    addresses = list(addresses)
+    if perfil is None and limites is None:
+        return [result for chunk in _repartir(_standardize_chunk, addresses, workers, chunk_size, executor)
+                for result in chunk]
+    procesar = partial(_standardize_chunk_medido, None if perfil is None else type(perfil),
+                       None if limites is None else limites.vacio())
+    results = []
+    for chunk, perfil_lote, limites_lote in _repartir(procesar, addresses, workers, chunk_size, executor):
+        results.extend(chunk)
+        if perfil is not None:
+            perfil.combinar(perfil_lote)
+        if limites is not None:
+            limites.combinar(limites_lote)
+    return results
+
+
+def parse_batch(addresses, workers: int = 1, chunk_size: int = TAMANO_LOTE, executor=None) -> pd.DataFrame:
+    """
+    Forma columnar de parse_address: retorna un DataFrame con una columna por
+    campo de ``DireccionNormalizada`` (ver ``CAMPOS``) y una fila por dirección,
+    con el índice de addresses si es una Series. Los campos ausentes son ''.
+    via_type, cardinal, handler y rejection son categóricas.
+
+    Las direcciones simples se resuelven en bloque con el camino vectorizado
+    (handler con_tipo); el resto se procesa como en standardize_batch.
+    """
+    direcciones = addresses if isinstance(addresses, pd.Series) else pd.Series(list(addresses), dtype=object)
+    partes = _extraer_simple(direcciones)
+    pendientes = partes['via_type'].isna().to_numpy()
+    tabla = partes.reindex(columns=list(CAMPOS)).fillna('')
+    tabla.loc[~pendientes, 'handler'] = 'con_tipo'
 
+    if pendientes.any():
+        registros = [
+            registro
+            for chunk in _repartir(_parse_chunk, direcciones[pendientes].tolist(), workers, chunk_size, executor)
+            for registro in chunk
+        ]
+        for campo, valores in zip(CAMPOS, zip(*registros)):
+            tabla.loc[pendientes, campo] = list(valores)
+    for campo in ('via_type', 'cardinal', 'handler', 'rejection'):
+        tabla[campo] = tabla[campo].astype('category')
+    return tabla
+
+
+def _extraer_simple(direcciones: pd.Series) -> pd.DataFrame:
+    """
+    Camino vectorizado: separa con operaciones de columna (``Series.str``) las
+    direcciones que, quitando ciudades, descriptivos y "No.", tienen la forma
+    TIPO NUM [NUM] [NUM] [NUM] (``reglas.PATRON_SIMPLE``), con los mismos
+    componentes que parse_address. Retorna las columnas via_type y num1..num4;
+    las filas que no resuelve quedan en NaN.
+    """
+    columnas = ['via_type', 'num1', 'num2', 'num3', 'num4']
+    if direcciones.empty or not (pd.api.types.is_object_dtype(direcciones) or
+                                 pd.api.types.is_string_dtype(direcciones)):
+        return pd.DataFrame(None, index=direcciones.index, columns=columnas, dtype=object)
+
+    # Los valores que no son texto quedan en NaN y siguen por el camino escalar
+    texto = direcciones.str.strip().str.upper().str.replace(
+        reglas.PALABRA_SIMPLE, reglas.eliminar_palabra, regex=True
+    )
+    partes = texto.str.extract(reglas.PATRON_SIMPLE).astype(object)
+    partes.columns = columnas
+    # map() infiere el tipo str de pandas 3; el resto de las columnas queda en object
+    partes['via_type'] = partes['via_type'].map(reglas.TIPOS_VIA).fillna(partes['via_type']).astype(object)
+    return partes
+
+
+def _standardize_simple(direcciones: pd.Series) -> pd.Series:
+    """
+    Texto de las direcciones que resuelve el camino vectorizado (``_extraer_simple``),
+    igual al de standardize_address. Las filas que no resuelve quedan en NaN.
+    """
+    partes = _extraer_simple(direcciones)
+    resultado = partes['via_type'] + ' ' + partes['num1']
+    for columna in ('num2', 'num3', 'num4'):
+        resultado = resultado + (' ' + partes[columna]).fillna('')
+    return resultado
+
+
+def standardize_dataframe(df: pd.DataFrame, column_name: str = "Direccion", workers: int = 1,
+                          chunk_size: int = TAMANO_LOTE, cache: CacheNormalizacion = None,
+                          store: AlmacenNormalizacion = None, perfil: PerfilNormalizacion = None,
+                          executor=None, limites: LimitesNormalizacion = None,
+                          output_column: str = "Direccion Estandarizada") -> pd.DataFrame:
+    """
+    Agrega a df la columna output_column (por defecto "Direccion Estandarizada") a
+    partir de column_name y lo retorna.
+    Las direcciones simples (TIPO + números) se resuelven en bloque con el camino
+    vectorizado; el resto pasa por standardize_batch con las mismas opciones.
+    El resultado es idéntico a aplicar standardize_address fila por fila. Con
+    limites, las filas de df con direcciones excedidas quedan ubicadas en limites.
+    """
     if column_name not in df.columns:
         raise ValueError(f"La columna '{column_name}' no existe en el archivo de entrada.")
 
-    print(f"Procesando {len(df)} direcciones...")
-    df["Direccion Estandarizada"] = df[column_name].apply(standardize_address)
-    
-    # Mostrar estadísticas
-    total = len(df)
-    procesadas = (df["Direccion Estandarizada"] != '').sum()
-    print(f"Direcciones procesadas exitosamente: {procesadas}/{total} ({procesadas/total*100:.1f}%)")
+    direcciones = df[column_name]
+    inicio = time.perf_counter()
+    simples = direcciones
+    if limites is not None and (pd.api.types.is_object_dtype(direcciones) or
+                                pd.api.types.is_string_dtype(direcciones)):
+        # Las direcciones largas tampoco pasan por el camino vectorizado
+        largas = (direcciones.str.len() > limites.longitud_maxima).fillna(False).to_numpy(dtype=bool)
+        if largas.any():
+            simples = direcciones.where(~largas)
+    resultado = _standardize_simple(simples)
+    pendientes = resultado.isna().to_numpy()
+    if perfil is not None:
+        resueltas = int(len(direcciones) - pendientes.sum())
+        perfil.registrar_lote('vectorizado', len(direcciones), resueltas, time.perf_counter() - inicio)
+        perfil.direcciones += resueltas
+
+    if pendientes.any():
+        resultado[pendientes] = standardize_batch(
+            direcciones[pendientes], workers, chunk_size, executor, cache, store, perfil, limites
+        )
+    if limites is not None:
+        limites.ubicar(direcciones)
+    df[output_column] = resultado.tolist()
+    return df
+
+
+def _rango_filas(texto: str) -> slice:
+    """
+    Tipo de argparse para --rows: INICIO:FIN, como un slice de Python.
+    """
+    inicio, separador, fin = texto.partition(':')
+    try:
+        if not separador:
+            raise ValueError(texto)
+        return slice(int(inicio) if inicio.strip() else None, int(fin) if fin.strip() else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"rango de filas inválido: '{texto}' (use INICIO:FIN, p. ej. 0:100000)"
+        ) from None
+
+
+def _fragmento(texto: str) -> tuple:
+    """
+    Tipo de argparse para --shard: K/N, la parte K (desde 0) de N.
+    """
+    indice, separador, partes = texto.partition('/')
+    try:
+        indice, partes = int(indice), int(partes)
+    except ValueError:
+        separador = ''
+    if not separador or partes < 1 or not 0 <= indice < partes:
+        raise argparse.ArgumentTypeError(f"fragmento inválido: '{texto}' (use K/N con 0 <= K < N, p. ej. 0/4)")
+    return indice, partes
+
+
+def _necesita_total(filas: slice = None, fragmento: tuple = None) -> bool:
+    # --shard y los extremos negativos de --rows se cuentan desde el final
+    return fragmento is not None or filas is not None and any(
+        extremo is not None and extremo < 0 for extremo in (filas.start, filas.stop)
+    )
+
+
+def _seleccion(total: int, filas: slice = None, fragmento: tuple = None) -> range:
+    """
+    Posiciones (desde 0, sin el encabezado) de las filas a procesar de una
+    entrada de total filas: el rango filas y, dentro de él, la parte K de N
+    partes consecutivas si fragmento es (K, N). Con total None (desconocido)
+    el rango no tiene final; solo sirve si no ``_necesita_total``.
+    """
+    rango = range(sys.maxsize if total is None else total)[filas or slice(None)]
+    if fragmento is not None:
+        indice, partes = fragmento
+        rango = rango[len(rango) * indice // partes:len(rango) * (indice + 1) // partes]
+    return rango
+
+
+def _expandir_entradas(patrones) -> list:
+    """
+    Archivos de entrada a partir de rutas o patrones glob, en orden y sin repetir.
+    """
+    entradas = []
+    for patron in patrones:
+        coincidencias = sorted(glob.glob(patron))
+        if not coincidencias:
+            raise FileNotFoundError(f"El archivo de entrada no existe: {patron}")
+        entradas.extend(entrada for entrada in coincidencias if entrada not in entradas)
+    return entradas
+
+
+def _salida_por_defecto(entrada: str, carpeta: str = None, fragmento: tuple = None) -> str:
+    # Nits_ciudad.xlsx -> Nits_ciudad_normalizadas.xlsx (y _parteKdeN con --shard)
+    base, extension = os.path.splitext(entrada)
+    if carpeta is not None:
+        base = os.path.join(carpeta, os.path.basename(base))
+    sufijo = '' if fragmento is None else f"_parte{fragmento[0]}de{fragmento[1]}"
+    return f"{base}_normalizadas{sufijo}{extension}"
+
+
+def _columna_salida(column_name: str) -> str:
+    return f"{column_name} Estandarizada"
+
+
+def _pasos(bloques, tamano: int):
+    """
+    Divide los bloques en partes de hasta tamano filas, para mostrar el avance
+    también dentro de un bloque.
+    """
+    for bloque in bloques:
+        if len(bloque) <= tamano:
+            yield bloque
+            continue
+        for inicio in range(0, len(bloque), tamano):
+            yield bloque.iloc[inicio:inicio + tamano].copy()
+
+
+def _normalizar_entrada(entrada: str, salida: str, columnas: list, args, cache, store, perfil,
+                        limites, executor, etiqueta: str) -> int:
+    """
+    Normaliza las filas seleccionadas de una entrada (``columnas`` en las columnas
+    "<columna> Estandarizada") y escribe la salida. Retorna las filas procesadas.
+    ``etiqueta`` va al inicio de la línea de avance.
+    """
+    if args.stream:
+        print(f"Procesando por bloques: {entrada}")
+        # Contar las filas recorre el archivo una vez más: solo si la selección lo necesita
+        total = contar_filas(entrada) if _necesita_total(args.rows, args.shard) else None
+        bloques = leer_bloques(entrada, args.block_size)
+    else:
+        print(f"Leyendo archivo: {entrada}")
+        datos = leer_archivo(entrada)
+        total = len(datos)
+        bloques = [datos]
+    filas = _seleccion(total, args.rows, args.shard)
+    if total is not None:
+        esperadas = len(filas)
+        print(f"Procesando {len(filas)} de {total} direcciones...")
+    else:
+        # Para el avance basta una estimación del tamaño del archivo
+        estimadas = None if args.no_progress else estimar_filas(entrada)
+        esperadas = None if estimadas is None else len(range(estimadas)[filas.start:filas.stop])
+        hasta = f" a {filas.stop - 1}" if filas.stop < sys.maxsize else ""
+        print(f"Procesando las direcciones desde la fila {filas.start}{hasta}...")
+
+    # Cada columna lleva su propia numeración de filas excedidas
+    limites_columnas = {}
+    if limites is not None:
+        for columna in columnas:
+            limites_columnas[columna] = limites.vacio()
+            limites_columnas[columna].saltar(filas.start)
+    procesadas = dict.fromkeys(columnas, 0)
+    progreso = ProgresoNormalizacion(esperadas, etiqueta, None if args.no_progress else sys.stderr)
+    # En serie el avance se muestra cada chunk_size filas; en paralelo, por bloque completo
+    tamano_paso = args.chunk_size if args.workers <= 1 else args.block_size
+    partes = []
+    escritor = None
+    if args.stream:
+        # Una entrada parquet fija los tipos de las columnas de una salida parquet
+        esquema = esquema_parquet(entrada) if os.path.splitext(entrada)[1].lower() == '.parquet' else None
+        escritor = EscritorBloques(salida, esquema)
+    try:
+        for paso in _pasos(seleccionar_filas(bloques, filas), tamano_paso):
+            for columna in columnas:
+                standardize_dataframe(paso, columna, args.workers, args.chunk_size, cache, store, perfil,
+                                      executor, limites_columnas.get(columna), _columna_salida(columna))
+                procesadas[columna] += int((paso[_columna_salida(columna)] != '').sum())
+            if escritor is not None:
+                escritor.escribir(paso)
+            else:
+                partes.append(paso)
+            progreso.avanzar(len(paso))
+        if escritor is not None:
+            escritor.cerrar()
+    finally:
+        if escritor is not None:
+            # Tras un error (o Ctrl+C) no queda una salida truncada
+            escritor.descartar()
+        progreso.terminar()
+
+    procesadas_filas = progreso.filas
+    if not procesadas_filas:
+        # En modo --stream el escritor no crea el archivo sin bloques
+        print(f"Sin filas seleccionadas; no se genera {salida}")
+        return 0
+    if escritor is None:
+        df = pd.concat(partes) if len(partes) > 1 else partes[0]
+        if args.group_duplicates:
+            group_duplicates(df, _columna_salida(columnas[0]), args.id_column)
+            print(resumen_duplicados(df))
+        escribir_archivo(df, salida)
+
+    for columna, cantidad in procesadas.items():
+        detalle = f" ({columna})" if len(columnas) > 1 else ""
+        print(f"Direcciones procesadas exitosamente{detalle}: {cantidad}/{procesadas_filas} "
+              f"({cantidad/procesadas_filas*100:.1f}%)")
+    print(f"Tiempo: {progreso.resumen()}")
+    if limites is not None:
+        excedidas = limites.vacio()
+        for limites_columna in limites_columnas.values():
+            excedidas.combinar(limites_columna)
+        excedidas.filas.sort(key=lambda fila: fila['fila'])
+        offending_rows = args.offending_rows or f"{os.path.splitext(salida)[0]}_excedidas.csv"
+        excedidas.exportar(offending_rows)
+        print(excedidas.resumen())
+        print(f"Filas excedidas guardadas en: {offending_rows}")
+    print(f"Archivo generado: {salida}")
+    return procesadas_filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normaliza las direcciones de archivos xlsx, csv o parquet")
+    parser.add_argument("-i", "--input", action="extend", nargs="+",
+                        help="archivos de entrada o patrones glob, p. ej. 'exportaciones/*.csv'; se puede "
+                             "repetir (por defecto Nits_ciudad.xlsx)")
+    parser.add_argument("-o", "--output",
+                        help="archivo de salida, con una sola entrada; el formato sale de la extensión "
+                             "(por defecto <entrada>_normalizadas con la extensión de la entrada)")
+    parser.add_argument("--output-dir",
+                        help="carpeta para las salidas con el nombre por defecto (por defecto, la de cada entrada)")
+    parser.add_argument("-c", "--column", action="append",
+                        help="columna con direcciones; se puede repetir para normalizar varias. Cada una "
+                             "se escribe en '<columna> Estandarizada' (por defecto Direccion)")
+    parser.add_argument("--rows", type=_rango_filas, metavar="INICIO:FIN",
+                        help="procesar solo las filas de datos INICIO a FIN-1 de cada entrada (la primera "
+                             "es la 0; se puede omitir un extremo, p. ej. 100000:)")
+    parser.add_argument("--shard", type=_fragmento, metavar="K/N",
+                        help="dividir las filas de cada entrada (o de --rows) en N partes consecutivas y "
+                             "procesar la parte K (desde 0), para repartir el trabajo entre máquinas")
+    parser.add_argument("--no-progress", action="store_true",
+                        help="no mostrar el avance (filas/s y tiempo restante) mientras se procesa")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="procesos para normalizar (0 = todos los núcleos, por defecto 1)")
+    parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE,
+                        help=f"direcciones por lote en modo paralelo (por defecto {TAMANO_LOTE})")
+    parser.add_argument("--cache-size", type=int, default=TAMANO_CACHE,
+                        help=f"direcciones distintas a recordar (0 = sin cache, por defecto {TAMANO_CACHE})")
+    parser.add_argument("--store",
+                        help="archivo SQLite con resultados de ejecuciones anteriores; solo se normalizan "
+                             "direcciones nuevas y se descarta si cambian las reglas")
+    parser.add_argument("--profile",
+                        help="guardar un perfil por regla y manejador (llamadas, coincidencias, tiempo "
+                             "y rechazos) en este archivo .json o .csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="leer y escribir por bloques para archivos que no caben en memoria")
+    parser.add_argument("--block-size", type=int, default=TAMANO_BLOQUE,
+                        help=f"filas por bloque en modo --stream (por defecto {TAMANO_BLOQUE})")
+    parser.add_argument("--group-duplicates", action="store_true",
+                        help="agregar las columnas 'Grupo Direccion' y 'Filas en Grupo' con las filas "
+                             "que comparten la misma dirección física (de la primera columna)")
+    parser.add_argument("--id-column",
+                        help="con --group-duplicates, columna de identificación (p. ej. el NIT) para contar "
+                             "cuántas identificaciones distintas comparten cada dirección")
+    parser.add_argument("--hardened", action="store_true",
+                        help="modo blindado: rechazar las direcciones demasiado largas o lentas y reportar "
+                             "sus filas en un archivo aparte")
+    parser.add_argument("--max-length", type=int, default=LONGITUD_MAXIMA,
+                        help=f"con --hardened, caracteres máximos por dirección (por defecto {LONGITUD_MAXIMA})")
+    parser.add_argument("--row-budget-ms", type=float, default=PRESUPUESTO_MS,
+                        help=f"con --hardened, milisegundos máximos por dirección (por defecto {PRESUPUESTO_MS:g})")
+    parser.add_argument("--offending-rows",
+                        help="con --hardened y una sola entrada, archivo CSV con las filas rechazadas por "
+                             "los límites (por defecto <salida>_excedidas.csv)")
+    args = parser.parse_args(argv)
+    if args.group_duplicates and args.stream:
+        parser.error("--group-duplicates necesita el archivo completo; no se puede usar con --stream")
+    if args.profile and os.path.splitext(args.profile)[1].lower() not in ('.json', '.csv'):
+        parser.error("--profile debe terminar en .json o .csv")
+    if args.block_size < 1:
+        parser.error("--block-size debe ser al menos 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size debe ser al menos 1")
+    if args.max_length < 1:
+        parser.error("--max-length debe ser al menos 1")
+    if args.row_budget_ms <= 0:
+        parser.error("--row-budget-ms debe ser mayor que 0")
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+
+    entradas = _expandir_entradas(args.input or ["Nits_ciudad.xlsx"])
+    if len(entradas) > 1 and (args.output or args.offending_rows):
+        parser.error(f"{len(entradas)} archivos de entrada: -o/--output y --offending-rows solo se pueden "
+                     f"usar con uno; use --output-dir")
+    columnas = args.column or ["Direccion"]
+    salidas = [args.output or _salida_por_defecto(entrada, args.output_dir, args.shard) for entrada in entradas]
+    for archivo in entradas + salidas:
+        if os.path.splitext(archivo)[1].lower() not in FORMATOS:
+            parser.error(f"formato no soportado: '{archivo}' (use {', '.join(FORMATOS)})")
+    for salida in salidas:
+        if salida in entradas:
+            parser.error(f"la salida {salida} sobrescribiría un archivo de entrada")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    cache = CacheNormalizacion(standardize_address, args.cache_size) if args.cache_size > 0 else None
+    store = AlmacenNormalizacion(args.store, rules_version()) if args.store else None
+    # Sin --profile basta contar los manejadores para el reporte final
+    perfil = PerfilNormalizacion() if args.profile else ConteoManejadores()
+    limites = LimitesNormalizacion(args.max_length, args.row_budget_ms) if args.hardened else None
+
+    inicio = time.perf_counter()
+    filas = 0
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        for numero, (entrada, salida) in enumerate(zip(entradas, salidas), 1):
+            etiqueta = f"[{numero}/{len(entradas)}] " if len(entradas) > 1 else ""
+            filas += _normalizar_entrada(entrada, salida, columnas, args, cache, store, perfil, limites,
+                                         executor, etiqueta)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if store is not None:
+            store.cerrar()
+    segundos = time.perf_counter() - inicio
 
-    df.to_excel(output_file, index=False)
-    print(f"Archivo generado: {output_file}")
+    # Reporte final
+    print(f"Reporte: {len(entradas)} archivo(s), {filas} filas en {duracion(segundos)} "
+          f"({filas / segundos if segundos else 0:.0f} filas/s, con lectura y escritura)")
+    print(perfil.resumen())
+    if cache is not None:
+        print(cache.resumen())
+    if store is not None:
+        print(store.resumen())
+    if args.profile:
+        perfil.exportar(args.profile)
+        print(f"Perfil guardado en: {args.profile}")
 
 
 if __name__ == "__main__":
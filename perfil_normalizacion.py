@@ -0,0 +1,168 @@
+"""
+Perfil de ejecución de la normalización (opcional).
+
+Registra, por regla de cada fase y por manejador (AEROPUERTO, VIA, AUTOPISTA,
+KM, patrón con nombre, patrón con tipo, números), cuántas veces se llamó,
+cuántas veces coincidió y el tiempo acumulado, además de los motivos de
+rechazo (resultado vacío). Solo se activa pasando un ``PerfilNormalizacion`` a
+``standardize_address``/``standardize_batch``; sin él no hay costo adicional.
+
+Para las reglas de una fase, "coincidencia" significa que la regla modificó
+la cadena; para un manejador, que produjo el resultado final.
+
+``ConteoManejadores`` es la versión liviana: solo cuenta manejadores y
+rechazos, sin medir tiempos ni reglas (el reporte final de la línea de
+comandos).
+"""
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+# Tipos de etapa
+REGLA = 'regla'
+MANEJADOR = 'manejador'
+RECHAZO = 'rechazo'
+
+COLUMNAS = ('tipo', 'nombre', 'llamadas', 'coincidencias', 'segundos')
+
+
+class PerfilNormalizacion:
+    """
+    Acumula llamadas, coincidencias y tiempo por etapa, y los rechazos por motivo.
+    """
+
+    def __init__(self):
+        # (tipo, nombre) -> [llamadas, coincidencias, segundos]
+        self.etapas = {}
+        self.rechazos = Counter()
+        self.direcciones = 0
+
+    def _registrar(self, tipo: str, nombre: str, coincide: bool, segundos: float):
+        etapa = self.etapas.get((tipo, nombre))
+        if etapa is None:
+            etapa = self.etapas[(tipo, nombre)] = [0, 0, 0.0]
+        etapa[0] += 1
+        etapa[1] += coincide
+        etapa[2] += segundos
+
+    def aplicar_fase(self, fase, s: str) -> str:
+        """
+        Aplica las reglas de una fase como ``aplicar_fase``, midiendo cada regla.
+        """
+        reloj = time.perf_counter
+        for regla in fase.reglas:
+            inicio = reloj()
+            nueva = regla.patron.sub(regla.reemplazo, s)
+            self._registrar(REGLA, f"{fase.nombre}.{regla.nombre}", nueva != s, reloj() - inicio)
+            s = nueva
+        return s
+
+    def medir(self, nombre: str, manejador, *args):
+        """
+        Llama a un manejador y registra su resultado: None significa que no
+        aplica y un resultado con ``rejection`` que rechazó la dirección.
+        """
+        inicio = time.perf_counter()
+        resultado = manejador(*args)
+        self._registrar(MANEJADOR, nombre, resultado is not None, time.perf_counter() - inicio)
+        if resultado is not None and resultado.rejection:
+            self.rechazos[nombre] += 1
+        return resultado
+
+    def registrar_lote(self, nombre: str, llamadas: int, coincidencias: int, segundos: float):
+        """
+        Registra un manejador aplicado a una columna completa (camino vectorizado).
+        """
+        self._sumar(MANEJADOR, nombre, llamadas, coincidencias, segundos)
+
+    def _sumar(self, tipo: str, nombre: str, llamadas: int, coincidencias: int, segundos: float):
+        etapa = self.etapas.setdefault((tipo, nombre), [0, 0, 0.0])
+        etapa[0] += llamadas
+        etapa[1] += coincidencias
+        etapa[2] += segundos
+
+    def rechazar(self, motivo: str):
+        self.rechazos[motivo] += 1
+
+    def combinar(self, otro: 'PerfilNormalizacion'):
+        """
+        Suma otro perfil a este (p. ej. el de un lote procesado en otro proceso).
+        """
+        for (tipo, nombre), valores in otro.etapas.items():
+            self._sumar(tipo, nombre, *valores)
+        self.rechazos.update(otro.rechazos)
+        self.direcciones += otro.direcciones
+
+    def filas(self) -> list:
+        """
+        Etapas y rechazos como filas con las columnas de ``COLUMNAS``.
+        """
+        filas = [
+            {'tipo': tipo, 'nombre': nombre, 'llamadas': llamadas,
+             'coincidencias': coincidencias, 'segundos': round(segundos, 6)}
+            for (tipo, nombre), (llamadas, coincidencias, segundos) in self.etapas.items()
+        ]
+        filas.extend(
+            {'tipo': RECHAZO, 'nombre': motivo, 'llamadas': cantidad, 'coincidencias': '', 'segundos': ''}
+            for motivo, cantidad in self.rechazos.most_common()
+        )
+        return filas
+
+    def exportar(self, path: str):
+        """
+        Guarda el perfil en JSON o CSV según la extensión de ``path``.
+        """
+        formato = os.path.splitext(path)[1].lower()
+        if formato == '.json':
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'direcciones': self.direcciones,
+                    'etapas': [fila for fila in self.filas() if fila['tipo'] != RECHAZO],
+                    'rechazos': dict(self.rechazos.most_common()),
+                }, f, indent=2, ensure_ascii=False)
+        elif formato == '.csv':
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+                escritor.writeheader()
+                escritor.writerows(self.filas())
+        else:
+            raise ValueError(f"Formato de perfil no soportado: '{path}'. Use .json o .csv")
+
+    def conteos(self) -> str:
+        """
+        Direcciones resueltas por cada manejador y rechazos por motivo, en una línea.
+        """
+        manejadores = [
+            f"{nombre} {coincidencias}"
+            for (tipo, nombre), (_, coincidencias, _) in self.etapas.items()
+            if tipo == MANEJADOR and coincidencias
+        ]
+        rechazos = [f"{motivo} {cantidad}" for motivo, cantidad in self.rechazos.most_common()]
+        return f"manejadores: {', '.join(manejadores) or '-'}; rechazos: {', '.join(rechazos) or '-'}"
+
+    def resumen(self) -> str:
+        return f"Perfil: {self.direcciones} direcciones; {self.conteos()}"
+
+
+class ConteoManejadores(PerfilNormalizacion):
+    """
+    Perfil que solo cuenta llamadas y coincidencias de los manejadores y los
+    rechazos; las reglas de las fases se aplican sin medirlas.
+    """
+
+    def aplicar_fase(self, fase, s: str) -> str:
+        for regla in fase.reglas:
+            s = regla.patron.sub(regla.reemplazo, s)
+        return s
+
+    def medir(self, nombre: str, manejador, *args):
+        resultado = manejador(*args)
+        self._registrar(MANEJADOR, nombre, resultado is not None, 0.0)
+        if resultado is not None and resultado.rejection:
+            self.rechazos[nombre] += 1
+        return resultado
+
+    def resumen(self) -> str:
+        return f"Conteo ({self.direcciones} direcciones normalizadas): {self.conteos()}"
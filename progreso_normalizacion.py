@@ -0,0 +1,86 @@
+"""
+Avance de la normalización por línea de comandos.
+
+Mientras se procesa una entrada muestra las filas procesadas, las filas por
+segundo y el tiempo estimado restante (ETA). En una terminal es una sola línea
+que se reescribe; si la salida va a un archivo o a un log se escribe una línea
+cada ``INTERVALO_LOG`` segundos. Al terminar da el tiempo y el rendimiento.
+"""
+import sys
+import time
+
+# Segundos mínimos entre dos actualizaciones del avance
+INTERVALO_TERMINAL = 0.2
+INTERVALO_LOG = 10.0
+
+
+def duracion(segundos: float) -> str:
+    """
+    Segundos como "12.3 s" si es menos de un minuto, o como H:MM:SS.
+    """
+    if segundos < 60:
+        return f"{segundos:.1f} s"
+    minutos, segundos = divmod(int(round(segundos)), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}:{minutos:02d}:{segundos:02d}"
+
+
+class ProgresoNormalizacion:
+    """
+    Avance de ``total`` filas. ``avanzar`` suma las filas procesadas y muestra
+    el avance en ``salida`` (nada si es None); ``terminar`` muestra la última
+    línea y la cierra. ``etiqueta`` va al inicio de la línea (p. ej. el archivo).
+    ``total`` puede ser una estimación, o None si no se conoce: entonces no se
+    muestran el porcentaje ni el ETA.
+    """
+
+    def __init__(self, total: int = None, etiqueta: str = '', salida=sys.stderr):
+        self.total = total
+        self.etiqueta = etiqueta
+        self.salida = salida
+        self.filas = 0
+        self.segundos = 0.0
+        self._terminal = salida is not None and salida.isatty()
+        self._intervalo = INTERVALO_TERMINAL if self._terminal else INTERVALO_LOG
+        self._inicio = self._mostrado = time.perf_counter()
+        self._filas_mostradas = 0
+
+    @property
+    def velocidad(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def avanzar(self, filas: int):
+        self.filas += filas
+        ahora = time.perf_counter()
+        self.segundos = ahora - self._inicio
+        if self.salida is not None and ahora - self._mostrado >= self._intervalo:
+            self._mostrado = ahora
+            self._mostrar()
+
+    def _mostrar(self):
+        self._filas_mostradas = self.filas
+        # Con un total estimado se pueden procesar más filas que el total
+        if self.total and self.filas <= self.total:
+            linea = f"{self.etiqueta}{self.filas}/{self.total} filas ({self.filas / self.total * 100:.1f}%)"
+        else:
+            linea = f"{self.etiqueta}{self.filas} filas"
+        linea += f", {self.velocidad:.0f} filas/s"
+        if self.velocidad and self.total and self.filas < self.total:
+            linea += f", ETA {duracion((self.total - self.filas) / self.velocidad)}"
+        if self._terminal:
+            # Volver al inicio de la línea y borrar el resto de la anterior
+            self.salida.write(f"\r{linea}\x1b[K")
+        else:
+            self.salida.write(f"{linea}\n")
+        self.salida.flush()
+
+    def terminar(self):
+        self.segundos = time.perf_counter() - self._inicio
+        if self.salida is not None and self.filas != self._filas_mostradas:
+            self._mostrar()
+        if self._terminal and self.filas:
+            self.salida.write("\n")
+            self.salida.flush()
+
+    def resumen(self) -> str:
+        return f"{self.filas} filas en {duracion(self.segundos)} ({self.velocidad:.0f} filas/s)"
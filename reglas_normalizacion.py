@@ -0,0 +1,499 @@
+"""
+Motor de reglas precompiladas para la normalización de direcciones.
+
+Las tablas de palabras (ciudades, departamentos, descriptivos, tipos de vía y
+sus variantes, complementos, cardinales) están en ``reglas_normalizacion.json``:
+agregar una ciudad o una variante como ``TRANSVESAL`` solo cambia ese archivo.
+
+Nada se compila al importar este módulo. Cada tabla, fase y patrón se construye
+la primera vez que se usa (``reglas.FASE_RUIDO``) y queda como atributo normal
+del módulo, así que los accesos siguientes no cuestan más que antes. Las
+sustituciones que se aplican en cadena se agrupan en fases con nombre
+(``FASES``), en el mismo orden en que las ejecuta el normalizador; los patrones
+de búsqueda de cada handler especial quedan como constantes compiladas. Ver
+REGLAS_NORMALIZACION.md para la descripción de cada regla.
+
+Las listas de palabras (ciudades, departamentos, descriptivos y tipos de vía) no
+se aplican como alternancias sino con ``escaner_palabras``, que las resuelve en
+un solo recorrido por la dirección.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+import escaner_palabras
+from escaner_palabras import (
+    CIUDAD, DEPARTAMENTO, DESCRIPTIVO, LUGAR_ADICIONAL, TIPO_VIA,
+    EliminadorPalabras, EscanerPalabras,
+)
+
+
+# ``patron`` es un re.Pattern o cualquier objeto con el mismo método sub()
+Regla = namedtuple('Regla', ['nombre', 'patron', 'reemplazo'])
+Fase = namedtuple('Fase', ['nombre', 'reglas'])
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_TABLAS = os.path.join(_DIRECTORIO, 'reglas_normalizacion.json')
+# Datos derivados de las tablas, junto a los .pyc
+_DIRECTORIO_DERIVADOS = os.path.join(_DIRECTORIO, '__pycache__')
+
+_TABLAS_REQUERIDAS = (
+    'version', 'ciudades', 'ciudades_adicionales', 'departamentos', 'descriptivos',
+    'descriptivos_autopista', 'complementos_aeropuerto', 'complementos_via_adicionales',
+    'errores_aeropuerto', 'tipos_via', 'tipos_via_patron', 'tipos_via_duplicados',
+    'tipos_via_con_nombre', 'tipos_via_km', 'tipos_via_autopista', 'cardinales',
+    'cortes_autopista_km', 'cortes_km_via',
+)
+
+
+# ===== CONSTRUCCIÓN PEREZOSA =====
+
+_este = sys.modules[__name__]
+# nombre -> (constructor, nombres que retorna el constructor)
+_CONSTRUCTORES = {}
+
+
+def _perezoso(*nombres):
+    """
+    Registra la función decorada como constructora de los atributos ``nombres``
+    del módulo. Se llama la primera vez que se pide alguno de ellos; con varios
+    nombres retorna una tupla con un valor por nombre.
+    """
+    def registrar(constructor):
+        for nombre in nombres:
+            _CONSTRUCTORES[nombre] = (constructor, nombres)
+        return constructor
+    return registrar
+
+
+def _compilar_perezoso(nombre: str, patron, flags: int = 0):
+    """
+    Registra un patrón que se compila la primera vez que se usa. ``patron`` es
+    el texto de la expresión o una función que lo arma a partir de las tablas.
+    """
+    _CONSTRUCTORES[nombre] = (lambda: re.compile(patron() if callable(patron) else patron, flags), (nombre,))
+
+
+def __getattr__(nombre: str):
+    if nombre not in _CONSTRUCTORES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    constructor, nombres = _CONSTRUCTORES[nombre]
+    valores = constructor()
+    globals().update(zip(nombres, valores if len(nombres) > 1 else (valores,)))
+    return globals()[nombre]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_CONSTRUCTORES))
+
+
+def precargar():
+    """
+    Construye de una vez todas las tablas, fases y patrones pendientes, p. ej.
+    antes de medir el tiempo de cada dirección.
+    """
+    for nombre in list(_CONSTRUCTORES):
+        getattr(_este, nombre)
+
+
+# ===== LISTAS DE CONTROL =====
+
+def cargar_tablas(path: str = RUTA_TABLAS) -> dict:
+    """
+    Lee las tablas de palabras de un archivo JSON y verifica que estén todas.
+    """
+    with open(path, encoding='utf-8') as f:
+        tablas = json.load(f)
+    faltantes = [clave for clave in _TABLAS_REQUERIDAS if clave not in tablas]
+    if faltantes:
+        raise ValueError(f"Faltan tablas en '{path}': {', '.join(faltantes)}")
+    return tablas
+
+
+@_perezoso(
+    'TABLAS', 'CIUDADES', 'CIUDADES_ADICIONALES', 'DEPARTAMENTOS', 'DESCRIPTIVOS',
+    'DESCRIPTIVOS_AUTOPISTA', 'COMPLEMENTOS_AEROPUERTO', 'COMPLEMENTOS_VIA', 'TIPOS_VIA_PATRON',
+    'TIPOS_VIA', 'CARDINALES',
+)
+def _tablas():
+    tablas = cargar_tablas()
+    complementos_aeropuerto = tuple(tablas['complementos_aeropuerto'])
+    return (
+        tablas,
+        # Ciudades que se eliminan cuando aparecen al inicio de la dirección
+        tuple(tablas['ciudades']),
+        # Ciudades que solo se eliminan en la limpieza general (no como prefijo)
+        tuple(tablas['ciudades_adicionales']),
+        tuple(tablas['departamentos']),
+        # Palabras descriptivas que se eliminan antes de aplicar los patrones
+        tuple(tablas['descriptivos']),
+        # Descriptivos que se eliminan del resto de una dirección de autopista sin KM
+        tuple(tablas['descriptivos_autopista']),
+        # Complementos que cortan la dirección en los handlers AEROPUERTO y VIA
+        complementos_aeropuerto,
+        complementos_aeropuerto + tuple(tablas['complementos_via_adicionales']),
+        # Tipos de vía reconocidos por los patrones finales
+        tuple(tablas['tipos_via_patron']),
+        # Variantes de cada tipo de vía -> abreviatura estándar (ACL->CL, ACR->KR, AENIDA->AV)
+        {
+            variante: abreviatura
+            for abreviatura, variantes in tablas['tipos_via'].items()
+            for variante in variantes
+        },
+        # Variantes de cada cardinal -> forma completa (NOR->NORTE, OCC->OESTE)
+        {
+            variante: cardinal
+            for cardinal, variantes in tablas['cardinales'].items()
+            for variante in variantes
+        },
+    )
+
+
+def buscar_en(patron: re.Pattern, s: str, posiciones):
+    """
+    Equivale a ``patron.search(s)`` cuando una coincidencia solo puede empezar
+    en alguna de ``posiciones`` (ordenadas de menor a mayor).
+    """
+    for posicion in posiciones:
+        coincidencia = patron.match(s, posicion)
+        if coincidencia:
+            return coincidencia
+    return None
+
+
+def _alternativas(palabras) -> str:
+    return '|'.join(palabras)
+
+
+def _tabla(nombre: str) -> str:
+    """
+    Alternancia con las palabras de una tabla del archivo JSON.
+    """
+    return _alternativas(_este.TABLAS[nombre])
+
+
+def _regla(nombre: str, patron: str, reemplazo: str, flags: int = 0) -> Regla:
+    return Regla(nombre, re.compile(patron, flags), reemplazo)
+
+
+def aplicar_fase(fase: Fase, s: str, perfil=None) -> str:
+    """
+    Aplica en orden todas las reglas de sustitución de una fase. Con ``perfil``
+    (un ``PerfilNormalizacion``) se mide cada regla.
+    """
+    if perfil is not None:
+        return perfil.aplicar_fase(fase, s)
+    for regla in fase.reglas:
+        s = regla.patron.sub(regla.reemplazo, s)
+    return s
+
+
+_I = re.IGNORECASE
+
+
+@_perezoso('ESCANER')
+def _escaner():
+    return EscanerPalabras((
+        (DESCRIPTIVO, _este.DESCRIPTIVOS),
+        (CIUDAD, _este.CIUDADES),
+        (LUGAR_ADICIONAL, _este.CIUDADES_ADICIONALES + ('AEROPUERTO',)),
+        (DEPARTAMENTO, _este.DEPARTAMENTOS),
+        (TIPO_VIA, _este.TIPOS_VIA_PATRON),
+    ))
+
+
+# ===== FASES DE SUSTITUCIÓN (en orden de aplicación) =====
+
+# Fase 1: eliminar coordenadas GPS y compactar espacios
+@_perezoso('FASE_COORDENADAS')
+def _fase_coordenadas():
+    return Fase('coordenadas', (
+        _regla('gps_decimales', r'\b\d+\.\d{5,}\b', ' '),
+        _regla('gps_cardinal', r'\b\d+\.\d+\s*[NSEOW]\b', ' ', _I),
+        _regla('compactar', r'\s+', ' '),
+    ))
+
+
+# Fase 2: normalizar errores de escritura de AEROPUERTO
+@_perezoso('FASE_TIPOGRAFIA')
+def _fase_tipografia():
+    return Fase('tipografia', (
+        _regla('aeropuerto', rf'\b({_tabla("errores_aeropuerto")})\b', 'AEROPUERTO', _I),
+    ))
+
+
+# Fase 3: preparar la detección de autopistas. Solo se aplica a las direcciones
+# con AUT, que es donde empiezan todas las variantes de autopista; la ciudad
+# antes de la autopista la quita el normalizador con el prefijo ya calculado
+@_perezoso('FASE_PREVIA_AUTOPISTA')
+def _fase_previa_autopista():
+    return Fase('previa_autopista', (
+        _regla('auto_pista', r'\bAUTO\s+PISTA\b', 'AUTO', _I),
+        _regla('autop', r'\bAUTOP\b', 'AUTO', _I),
+    ))
+
+
+# Fase 4: eliminar N, S, E, O solos entre números (no NORTE, SUR, ESTE, OESTE)
+@_perezoso('FASE_ENTRE_NUMEROS')
+def _fase_entre_numeros():
+    return Fase('entre_numeros', (
+        _regla('n_entre_numeros', r'\b([0-9]+)\s+([NSEO])\s+([0-9]+)', r'\1 \3'),
+    ))
+
+
+# Fase 5: eliminar teléfonos (secuencias de 7+ dígitos)
+@_perezoso('FASE_RUIDO')
+def _fase_ruido():
+    return Fase('ruido', (
+        _regla('telefonos', r'\b\d{7,}\b', ' '),
+    ))
+
+
+# Fase 6: separar elementos pegados y eliminar símbolos
+@_perezoso('FASE_SEPARACION')
+def _fase_separacion():
+    tipos = _tabla('tipos_via_duplicados')
+    return Fase('separacion', (
+        _regla('tipos_pegados', r'\b(AV|AK|CR|CL|KR|TV|DG)(CL|CR|KR|AV|AK)\b', r'\1 \2', _I),
+        _regla('tipo_numero', r'(CR|CL|AV|KR|AK|TV|DG)(\d)', r'\1 \2', _I),
+        _regla('letra_numero', r'(\d+[A-Z])(\d)', r'\1 \2'),
+        _regla('cardinal_pegado', r'(\d+[A-Z]?)(SUR|NORTE|ESTE|OESTE)', r'\1 \2', _I),
+        _regla('b_cardinal', r'\b(\d+[A-Z]?)\s+B\s+(SUR|NORTE|ESTE|OESTE)\b', r'\1 BIS \2', _I),
+        _regla('simbolos', r'[#\-,;.()]+', ' '),
+        # TIPO_VIA TIPO_VIA NUMERO -> TIPO_VIA NUMERO (se mantiene el primer tipo)
+        _regla('tipos_duplicados', rf'\b({tipos})\s+({tipos})\s+(\d)', r'\1 \3', _I),
+    ))
+
+
+# Fase 7: eliminar abreviaturas de número, descriptivos, ciudades y departamentos
+@_perezoso('FASE_DESCRIPTIVOS')
+def _fase_descriptivos():
+    return Fase('descriptivos', (
+        _regla('abreviatura_numero', r'\b(N[OÓº°]|NO|NR|NUM)\b', ' ', _I),
+        # Primero los descriptivos y luego, sobre lo que queda, ciudades y departamentos
+        Regla(
+            'descriptivos_y_lugares',
+            EliminadorPalabras(_este.ESCANER, DESCRIPTIVO, CIUDAD | LUGAR_ADICIONAL | DEPARTAMENTO),
+            ' ',
+        ),
+        _regla('compactar', r'\s+', ' '),
+    ))
+
+
+@_perezoso('FASES')
+def _fases():
+    return (
+        _este.FASE_COORDENADAS,
+        _este.FASE_TIPOGRAFIA,
+        _este.FASE_PREVIA_AUTOPISTA,
+        _este.FASE_ENTRE_NUMEROS,
+        _este.FASE_RUIDO,
+        _este.FASE_SEPARACION,
+        _este.FASE_DESCRIPTIVOS,
+    )
+
+
+# ===== PATRONES DE LOS HANDLERS ESPECIALES =====
+
+ESPACIOS = re.compile(r'\s+')
+DIGITO_INICIAL = re.compile(r'\d')
+
+# AEROPUERTO y VIA (la ciudad al inicio la quita el normalizador con ESCANER.prefijos)
+_compilar_perezoso(
+    'COMPLEMENTOS_AEROPUERTO_RE', lambda: rf'\b({_alternativas(_este.COMPLEMENTOS_AEROPUERTO)})\b.*$', _I,
+)
+_compilar_perezoso('COMPLEMENTOS_VIA_RE', lambda: rf'\b({_alternativas(_este.COMPLEMENTOS_VIA)})\b.*$', _I)
+_compilar_perezoso('PALABRA_VIA', r'\bVIA\b', _I)
+
+# AUTOPISTA
+_compilar_perezoso('AUTOPISTA_INICIO', r'^(?:AUTOPISTA|AUT\.?|AUTO(?:PISTA)?\.?|AUTO[A-Z]+|AUT[A-Z]+)', _I)
+_compilar_perezoso('AUTOPISTA_CON_PUNTO', r'^(AUTOPISTA\.?|AUT\.|AUTO\.)\s*(.+)$', _I)
+_compilar_perezoso('AUTOPISTA_PEGADA', r'^(AUTO[A-Z]+|AUT[A-Z]+)\s*(.+)?$', _I)
+_compilar_perezoso('AUTOPISTA_CON_ESPACIO', r'^(AUTOPISTA|AUTO|AUT)\s+(.+)$', _I)
+_compilar_perezoso('AUTOPISTA_NOMBRE_ANTES_KM', r'^(.+?)(?:KM|K\.M\.?|KILOMETRO)\s*(\d+[.\d]*)\s*(.+)?', _I)
+_compilar_perezoso('AUTOPISTA_NOMBRE', r'^([A-Z]+(?:\s+[A-Z]+)?)(?:\s+|$)', _I)
+# (?<!\d): el número antes de KM empieza donde empiezan sus dígitos; sin esto la
+# búsqueda se reintenta en cada dígito de una serie larga (tiempo cuadrático)
+_compilar_perezoso(
+    'AUTOPISTA_KM', r'(?:(?<!\d)(\d+)\s*(?:KM|K\.M\.?|KILOMETRO)|(?:KM|K\.M\.?|KILOMETRO)\s*(\d+[.\d]*))\s*(.+)?', _I,
+)
+_compilar_perezoso('AUTOPISTA_RESTO_KM', lambda: rf'\b({_tabla("cortes_autopista_km")})\b', _I)
+_compilar_perezoso('AUTOPISTA_VIA_KM', lambda: rf'\b({_tabla("tipos_via_km")})\b', _I)
+_compilar_perezoso('AUTOPISTA_DESCRIPTIVOS', lambda: rf'\b({_alternativas(_este.DESCRIPTIVOS_AUTOPISTA)})\b', _I)
+_compilar_perezoso('AUTOPISTA_SIMBOLOS', r'[#\-\.]+')
+_compilar_perezoso(
+    'AUTOPISTA_VIA_NUMEROS', lambda: rf'\b({_tabla("tipos_via_autopista")})\s+([A-Z0-9]+)\s+([A-Z0-9]+)', _I,
+)
+_compilar_perezoso('AUTOPISTA_NUMEROS', r'\b\d+(?:[A-Z]?)(?:\.\d+)?\b')
+
+# KM VÍA: KM <numero> <resto hasta un corte o el final>. KM_VIA_INICIO ubica
+# cada KM candidato y KM_VIA se prueba anclado en él (ver _manejar_km_via)
+_compilar_perezoso('KM_VIA_INICIO', r'(?:KM|K\.M\.?|KILOMETRO)\s+\d+[.\d]*\s', _I)
+_compilar_perezoso(
+    'KM_VIA',
+    lambda: rf'(?:KM|K\.M\.?|KILOMETRO)\s+(\d+[.\d]*)\s+(.+?)(?=\s+(?:{_tabla("cortes_km_via")}|$))',
+    _I,
+)
+_compilar_perezoso('KM_TIPO_VIA', lambda: rf'\b({_tabla("tipos_via_km")})\s+(.+)', _I)
+
+
+# ===== PATRONES FINALES =====
+
+# TIPO_VIA + NOMBRE (1-3 palabras) + NUMEROS, p. ej. "AV CIRCUNVALAR 45 23"
+_compilar_perezoso(
+    'PATRON_CON_NOMBRE',
+    lambda: rf'\b({_tabla("tipos_via_con_nombre")})'
+            r'\s+(?:[A-Z]+\s+){1,3}?(\d+[A-Z]?)\s+(\d+[A-Z]?)(?:\s+(\d+[A-Z]?))?',
+    _I,
+)
+
+# TIPO_VIA + NUM [CARDINAL] [NUM] [NUM] [NUM]
+_compilar_perezoso(
+    'PATRON_CON_TIPO',
+    lambda: rf'\b({_alternativas(_este.TIPOS_VIA_PATRON)})'
+            rf'\s+([A-Z0-9]+)(?:\s+({_alternativas(_este.CARDINALES)}))?'
+            r'(?:\s+([A-Z0-9]+))?(?:\s+([A-Z0-9]+))?(?:\s+([A-Z0-9]+))?',
+    _I,
+)
+
+# Sin tipo de vía: al menos 2 bloques al inicio
+_compilar_perezoso('PATRON_NUMEROS', r'^([A-Z0-9]+)\s+([A-Z0-9]+)(?:\s+([A-Z0-9]+))?')
+
+
+# ===== CAMINO VECTORIZADO =====
+
+# Tipos de vía que ninguna fase modifica: excluye los que también son
+# descriptivos o tienen handler propio (DG, VEREDA, VDA, VIA)
+@_perezoso('TIPOS_VIA_SIMPLES')
+def _tipos_via_simples():
+    return tuple(t for t in _este.TIPOS_VIA_PATRON if _este.ESCANER.clasificar(t) == TIPO_VIA)
+
+
+# Símbolos que la fase de separación convierte en espacios (sin el punto, que
+# usan las reglas de coordenadas)
+_SEPARADORES_SIMPLES = r'\s#,;()\-'
+_NUMERO_SIMPLE = r'([0-9]{1,6}[A-Z]?)'
+
+# Palabras que dispararían un handler especial o alguna regla de las fases previas
+_PALABRA_CON_HANDLER = re.compile(r'AEROPUERTO|KM|KILOMETRO|^AUT|^VIA$')
+
+
+def _palabras_eliminables() -> list:
+    """
+    Palabras sueltas que la fase de descriptivos elimina siempre, sin importar
+    sus vecinas: descriptivos, ciudades y departamentos de una palabra que no
+    son tipo de vía, no inician una frase y no activan otra regla.
+    """
+    entradas = (_este.DESCRIPTIVOS + _este.CIUDADES + _este.CIUDADES_ADICIONALES + ('AEROPUERTO',) +
+                _este.DEPARTAMENTOS)
+    inician_frase = {e.split(' ')[0] for e in entradas if ' ' in e}
+    palabras = []
+    for palabra in entradas:
+        if (' ' in palabra or palabra in inician_frase or palabra in _este.TIPOS_VIA_PATRON or
+                _PALABRA_CON_HANDLER.search(palabra)):
+            continue
+        if any(aplicar_fase(fase, palabra) != palabra
+               for fase in (_este.FASE_TIPOGRAFIA, _este.FASE_PREVIA_AUTOPISTA, _este.FASE_ENTRE_NUMEROS,
+                            _este.FASE_RUIDO, _este.FASE_SEPARACION)):
+            continue
+        palabras.append(palabra)
+    return palabras
+
+
+def _firma() -> str:
+    """
+    Huella de las tablas y del código que deriva datos de ellas.
+    """
+    huella = hashlib.sha256()
+    for path in (RUTA_TABLAS, __file__, escaner_palabras.__file__):
+        with open(path, 'rb') as f:
+            huella.update(f.read())
+    return huella.hexdigest()[:16]
+
+
+@_perezoso('DERIVADOS')
+def _derivados() -> dict:
+    """
+    Datos derivados de las tablas que cuesta calcular (las palabras que el camino
+    vectorizado puede eliminar, que exigen aplicar las fases a cada entrada).
+    Se guardan en ``__pycache__`` con la firma de las tablas y del código y se
+    recalculan cuando cambia cualquiera de ellos; si no se puede escribir, solo
+    se calculan.
+    """
+    firma = _firma()
+    path = os.path.join(_DIRECTORIO_DERIVADOS, f'reglas_normalizacion.{firma}.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    derivados = {'eliminables': _palabras_eliminables()}
+    try:
+        os.makedirs(_DIRECTORIO_DERIVADOS, exist_ok=True)
+        for anterior in glob.glob(os.path.join(_DIRECTORIO_DERIVADOS, 'reglas_normalizacion.*.json')):
+            os.remove(anterior)
+        temporal = f'{path}.{os.getpid()}'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(derivados, f, ensure_ascii=False)
+        os.replace(temporal, path)
+    except OSError:
+        pass
+    return derivados
+
+
+# Palabras eliminables (más las abreviaturas de número) y expresiones de una
+# palabra como L\d+
+@_perezoso('PALABRAS_ELIMINABLES', 'PATRON_ELIMINABLES')
+def _eliminables():
+    eliminables = _este.DERIVADOS['eliminables']
+    return (
+        frozenset([p for p in eliminables if re.escape(p) == p] + ['NO', 'NR', 'NUM']),
+        re.compile(_alternativas(p for p in eliminables if re.escape(p) != p)),
+    )
+
+
+# Palabra completa entre separadores
+PALABRA_SIMPLE = rf'[^{_SEPARADORES_SIMPLES}]+'
+
+
+@_perezoso('eliminar_palabra')
+def _eliminar_palabra():
+    palabras = _este.PALABRAS_ELIMINABLES
+    patron = _este.PATRON_ELIMINABLES
+
+    def eliminar_palabra(coincidencia: re.Match) -> str:
+        """
+        Reemplazo para ``Series.str.replace(PALABRA_SIMPLE, ...)``: cambia por un
+        espacio las palabras que la fase de descriptivos elimina siempre.
+        """
+        palabra = coincidencia.group()
+        if palabra in palabras or patron.fullmatch(palabra):
+            return ' '
+        return palabra
+
+    return eliminar_palabra
+
+
+# Dirección en mayúsculas, sin palabras eliminables, de la forma
+# TIPO NUM [NUM] [NUM] [NUM] [NUM...]: ninguna fase ni handler especial la
+# altera y el resultado es el de PATRON_CON_TIPO (tipo y los 4 primeros números).
+# Se usa con Series.str.extract.
+_SEPARADOR = rf'[{_SEPARADORES_SIMPLES}]+'
+
+
+@_perezoso('PATRON_SIMPLE')
+def _patron_simple():
+    return (
+        rf'^[{_SEPARADORES_SIMPLES}]*({_alternativas(_este.TIPOS_VIA_SIMPLES)})'
+        rf'{_SEPARADOR}{_NUMERO_SIMPLE}'
+        rf'(?:{_SEPARADOR}{_NUMERO_SIMPLE}'
+        rf'(?:{_SEPARADOR}{_NUMERO_SIMPLE}'
+        rf'(?:{_SEPARADOR}{_NUMERO_SIMPLE})?)?)?'
+        rf'(?:{_SEPARADOR}[0-9]{{1,6}}[A-Z]?)*'
+        rf'[{_SEPARADORES_SIMPLES}]*$'
+    )
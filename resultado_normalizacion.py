@@ -0,0 +1,55 @@
+"""
+Resultado estructurado de la normalización.
+
+``DireccionNormalizada`` guarda los componentes de una dirección normalizada
+(tipo de vía, números, cardinal), el manejador que la resolvió y el motivo de
+rechazo, si lo hubo. El texto que retorna ``standardize_address`` se deriva del
+registro (``texto``), así que quien necesita los componentes no tiene que volver
+a separar la cadena.
+"""
+from collections import namedtuple
+
+CAMPOS = ('via_type', 'num1', 'cardinal', 'num2', 'num3', 'num4', 'name', 'km', 'handler', 'rejection')
+
+# Manejador cuyo resultado empieza por "AUTOPISTA <nombre>"
+AUTOPISTA = 'autopista'
+
+
+class DireccionNormalizada(namedtuple('DireccionNormalizada', CAMPOS, defaults=('',) * len(CAMPOS))):
+    """
+    Componentes de una dirección normalizada; los campos ausentes son ''.
+
+    - via_type, num1, cardinal, num2, num3, num4: TIPO NUM [CARDINAL] [NUM] [NUM] [NUM]
+    - name: descripción de AEROPUERTO/VIA o nombre de la AUTOPISTA
+    - km: kilómetro (AUTOPISTA, KM VÍA)
+    - handler: manejador que produjo el resultado (ver ``standardize_address``)
+    - rejection: motivo de rechazo; '' si la dirección se normalizó
+    """
+    __slots__ = ()
+
+    @property
+    def texto(self) -> str:
+        """
+        Dirección normalizada como texto ('' si fue rechazada).
+        """
+        if self.rejection:
+            return ''
+        if self.handler == AUTOPISTA:
+            partes = ['AUTOPISTA', self.name]
+        elif self.name:
+            partes = [self.name]
+        else:
+            partes = []
+        if self.km:
+            partes += ['KM', self.km]
+        partes.extend(
+            campo for campo in (self.via_type, self.num1, self.cardinal, self.num2, self.num3, self.num4) if campo
+        )
+        return ' '.join(partes)
+
+    def __str__(self):
+        return self.texto
+
+
+def rechazada(motivo: str, handler: str = '') -> DireccionNormalizada:
+    return DireccionNormalizada(handler=handler, rejection=motivo)
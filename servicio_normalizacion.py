@@ -0,0 +1,381 @@
+"""
+Servicio HTTP de normalización de direcciones (asyncio, solo biblioteca estándar).
+
+Endpoints:
+
+- ``POST /normalize``: el cuerpo es un JSON con una dirección (``"CALLE 72 # 10-34"``
+  o ``{"address": "CALLE 72 # 10-34"}``), que retorna
+  ``{"address": ..., "normalized": ...}``, o con un arreglo de direcciones, que
+  retorna el arreglo de direcciones normalizadas en el mismo orden.
+- ``GET /normalize?address=...``: una dirección.
+- ``GET /metrics``: solicitudes, direcciones, lotes, latencia (p50/p99) y
+  direcciones por segundo.
+- ``GET /health``: ``{"status": "ok"}``.
+
+Las direcciones de solicitudes concurrentes se agrupan en lotes (hasta
+``tamano_lote`` direcciones o ``espera_maxima`` segundos) que se normalizan en
+un pool de procesos, de modo que el event loop nunca ejecuta las expresiones
+regulares.
+
+El cuerpo de un POST se lee según ``Content-Length``. Una solicitud que no se
+puede delimitar (``Transfer-Encoding``, ``Content-Length`` inválido o demasiado
+grande, líneas más largas que el límite del lector) se responde con un error y
+se cierra la conexión.
+
+Uso local::
+
+    python servicio_normalizacion.py --port 8080
+    curl -d '["CALLE 72 # 10-34", "KR 15 85 23"]' http://127.0.0.1:8080/normalize
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from urllib.parse import parse_qs, urlsplit
+
+from normalizar_direcciones import _standardize_chunk
+
+TAMANO_LOTE_SERVICIO = 256
+ESPERA_MAXIMA = 0.005
+TAMANO_MAXIMO_CUERPO = 16 * 1024 * 1024
+MUESTRAS_LATENCIA = 10000
+VENTANA_METRICAS = 60.0
+
+ESTADOS_HTTP = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+    501: 'Not Implemented',
+}
+
+
+class ErrorSolicitud(Exception):
+    """
+    Error del cliente: se responde con ``estado`` y el mensaje.
+    """
+
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class MetricasServicio:
+    """
+    Contadores del servicio y latencias de las últimas solicitudes.
+    """
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.solicitudes = 0
+        self.errores = 0
+        self.direcciones = 0
+        self.lotes = 0
+        self.direcciones_en_lotes = 0
+        # (momento, latencia, direcciones) de las últimas solicitudes atendidas
+        self._recientes = deque(maxlen=MUESTRAS_LATENCIA)
+
+    def registrar_solicitud(self, latencia: float, direcciones: int):
+        self.solicitudes += 1
+        self.direcciones += direcciones
+        self._recientes.append((time.monotonic(), latencia, direcciones))
+
+    def registrar_lote(self, tamano: int):
+        self.lotes += 1
+        self.direcciones_en_lotes += tamano
+
+    def resumen(self) -> dict:
+        ahora = time.monotonic()
+        activo = ahora - self.inicio
+        latencias = sorted(latencia for _, latencia, _ in self._recientes)
+        en_ventana = sum(n for momento, _, n in self._recientes if ahora - momento <= VENTANA_METRICAS)
+
+        def percentil(p):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000, 3)
+
+        return {
+            'uptime_s': round(activo, 1),
+            'requests': self.solicitudes,
+            'errors': self.errores,
+            'addresses': self.direcciones,
+            'batches': self.lotes,
+            'mean_batch_size': round(self.direcciones_en_lotes / self.lotes, 1) if self.lotes else 0,
+            'latency_ms': {'p50': percentil(0.50), 'p99': percentil(0.99), 'samples': len(latencias)},
+            'addresses_per_s': round(self.direcciones / activo, 1) if activo else 0,
+            f'addresses_per_s_last_{int(VENTANA_METRICAS)}s': round(en_ventana / min(activo, VENTANA_METRICAS), 1)
+            if activo else 0,
+        }
+
+
+class AgrupadorLotes:
+    """
+    Junta las direcciones de solicitudes concurrentes en lotes y los normaliza
+    en ``executor`` sin bloquear el event loop. Un lote sale al llegar a
+    ``tamano_lote`` direcciones o cuando pasan ``espera_maxima`` segundos desde
+    su primera dirección. Como máximo hay ``max_en_vuelo`` lotes en proceso.
+    """
+
+    def __init__(self, executor, tamano_lote: int = TAMANO_LOTE_SERVICIO,
+                 espera_maxima: float = ESPERA_MAXIMA, max_en_vuelo: int = 2,
+                 metricas: MetricasServicio = None):
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser al menos 1.")
+        self.executor = executor
+        self.tamano_lote = tamano_lote
+        self.espera_maxima = espera_maxima
+        self.metricas = metricas
+        self._cola = asyncio.Queue()
+        self._en_vuelo = asyncio.Semaphore(max_en_vuelo)
+        self._despachador = None
+        self._tareas = set()
+
+    def iniciar(self):
+        self._despachador = asyncio.get_running_loop().create_task(self._despachar())
+
+    async def detener(self):
+        if self._despachador is not None:
+            self._despachador.cancel()
+            await asyncio.gather(self._despachador, return_exceptions=True)
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+
+    async def normalizar(self, addresses: list) -> list:
+        loop = asyncio.get_running_loop()
+        futuros = [loop.create_future() for _ in addresses]
+        for address, futuro in zip(addresses, futuros):
+            self._cola.put_nowait((address, futuro))
+        return list(await asyncio.gather(*futuros))
+
+    async def _despachar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            limite = loop.time() + self.espera_maxima
+            while len(lote) < self.tamano_lote:
+                # Primero lo que ya está en cola; solo se espera si está vacía
+                try:
+                    lote.append(self._cola.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            await self._en_vuelo.acquire()
+            tarea = loop.create_task(self._procesar(lote))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+
+    async def _procesar(self, lote: list):
+        try:
+            addresses = [address for address, _ in lote]
+            try:
+                resultados = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, _standardize_chunk, addresses
+                )
+            except Exception as exc:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(exc)
+                return
+            if self.metricas is not None:
+                self.metricas.registrar_lote(len(lote))
+            for (_, futuro), resultado in zip(lote, resultados):
+                # La solicitud pudo cancelarse (cliente desconectado)
+                if not futuro.done():
+                    futuro.set_result(resultado)
+        finally:
+            self._en_vuelo.release()
+
+
+def _validar_direcciones(valores) -> list:
+    for valor in valores:
+        if valor is not None and not isinstance(valor, (str, int, float)):
+            raise ErrorSolicitud(400, "Cada dirección debe ser texto, número o null.")
+    return valores
+
+
+class ServicioNormalizacion:
+    """
+    Servidor HTTP/1.1 mínimo (con keep-alive) sobre ``asyncio.start_server``.
+    """
+
+    def __init__(self, agrupador: AgrupadorLotes, metricas: MetricasServicio):
+        self.agrupador = agrupador
+        self.metricas = metricas
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    solicitud = await self._leer_solicitud(reader)
+                except ErrorSolicitud as exc:
+                    # Sin poder delimitar la solicitud no se puede leer la siguiente
+                    self.metricas.errores += 1
+                    await self._responder(writer, exc.estado, {'error': str(exc)}, cerrar=True)
+                    break
+                if solicitud is None:
+                    break
+                metodo, destino, cuerpo, cerrar = solicitud
+
+                inicio = time.perf_counter()
+                try:
+                    estado, respuesta, direcciones = await self._despachar(metodo, destino, cuerpo)
+                except ErrorSolicitud as exc:
+                    estado, respuesta, direcciones = exc.estado, {'error': str(exc)}, 0
+                except Exception as exc:
+                    estado, respuesta, direcciones = 500, {'error': f'{type(exc).__name__}: {exc}'}, 0
+                if estado == 200 and direcciones:
+                    self.metricas.registrar_solicitud(time.perf_counter() - inicio, direcciones)
+                elif estado >= 400:
+                    self.metricas.errores += 1
+                await self._responder(writer, estado, respuesta, cerrar)
+                if cerrar:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _leer_linea(reader: asyncio.StreamReader, estado: int, mensaje: str) -> bytes:
+        try:
+            return await reader.readline()
+        except ValueError:
+            # Línea más larga que el límite del StreamReader
+            raise ErrorSolicitud(estado, mensaje) from None
+
+    async def _leer_solicitud(self, reader: asyncio.StreamReader):
+        """
+        Lee la línea de solicitud, los encabezados y el cuerpo, y retorna
+        (metodo, destino, cuerpo, cerrar), o None si el cliente cerró la conexión.
+        Una solicitud que no se puede delimitar levanta ErrorSolicitud.
+        """
+        linea = await self._leer_linea(reader, 400, "Línea de solicitud demasiado larga.")
+        if not linea.strip():
+            return None
+        try:
+            metodo, destino, version = linea.decode('latin-1').split()
+        except ValueError:
+            raise ErrorSolicitud(400, "Línea de solicitud inválida.") from None
+        encabezados = {}
+        while True:
+            encabezado = await self._leer_linea(reader, 431, "Encabezado demasiado largo.")
+            if encabezado in (b'\r\n', b'\n', b''):
+                break
+            nombre, _, valor = encabezado.decode('latin-1').partition(':')
+            encabezados[nombre.strip().lower()] = valor.strip()
+
+        cerrar = (encabezados.get('connection', '').lower() == 'close' or
+                  version == 'HTTP/1.0' and encabezados.get('connection', '').lower() != 'keep-alive')
+        # Solo se admiten cuerpos con Content-Length (sin chunked ni otras codificaciones)
+        if 'transfer-encoding' in encabezados:
+            raise ErrorSolicitud(501, "Transfer-Encoding no soportado; envíe el cuerpo con Content-Length.")
+        largo = encabezados.get('content-length', '0')
+        if not (largo.isascii() and largo.isdigit()):
+            raise ErrorSolicitud(400, f"Content-Length inválido: {largo!r}")
+        largo = int(largo)
+        if largo > TAMANO_MAXIMO_CUERPO:
+            raise ErrorSolicitud(413, "Cuerpo demasiado grande.")
+        cuerpo = await reader.readexactly(largo) if largo else b''
+        return metodo, destino, cuerpo, cerrar
+
+    async def _despachar(self, metodo: str, destino: str, cuerpo: bytes) -> tuple:
+        """
+        Retorna (estado, respuesta, direcciones normalizadas).
+        """
+        url = urlsplit(destino)
+        if url.path == '/health':
+            return 200, {'status': 'ok'}, 0
+        if url.path == '/metrics':
+            return 200, self.metricas.resumen(), 0
+        if url.path != '/normalize':
+            raise ErrorSolicitud(404, f"Ruta desconocida: {url.path}")
+
+        if metodo == 'GET':
+            valores = parse_qs(url.query).get('address')
+            if not valores:
+                raise ErrorSolicitud(400, "Falta el parámetro 'address'.")
+            [resultado] = await self.agrupador.normalizar(valores[:1])
+            return 200, {'address': valores[0], 'normalized': resultado}, 1
+        if metodo != 'POST':
+            raise ErrorSolicitud(405, f"Método no permitido: {metodo}")
+
+        try:
+            datos = json.loads(cuerpo or b'null')
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ErrorSolicitud(400, "El cuerpo no es JSON válido.")
+        if isinstance(datos, list):
+            resultados = await self.agrupador.normalizar(_validar_direcciones(datos))
+            return 200, resultados, len(datos)
+        if isinstance(datos, dict):
+            if 'address' not in datos:
+                raise ErrorSolicitud(400, "Falta el campo 'address'.")
+            datos = datos['address']
+        [address] = _validar_direcciones([datos])
+        [resultado] = await self.agrupador.normalizar([address])
+        return 200, {'address': address, 'normalized': resultado}, 1
+
+    @staticmethod
+    async def _responder(writer: asyncio.StreamWriter, estado: int, respuesta, cerrar: bool):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {estado} {ESTADOS_HTTP.get(estado, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode('latin-1') + cuerpo
+        )
+        await writer.drain()
+
+
+async def servir(host: str = '127.0.0.1', port: int = 8080, workers: int = 0,
+                 tamano_lote: int = TAMANO_LOTE_SERVICIO, espera_maxima: float = ESPERA_MAXIMA):
+    """
+    Arranca el pool de procesos y el servidor, y atiende hasta ser cancelado.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    metricas = MetricasServicio()
+    # Con fork, un proceso del pool creado con una conexión abierta heredaría su
+    # socket y la conexión no se cerraría al cerrarla el servidor
+    contexto = get_context('forkserver') if 'forkserver' in get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        agrupador = AgrupadorLotes(executor, tamano_lote, espera_maxima, max_en_vuelo=2 * workers,
+                                   metricas=metricas)
+        agrupador.iniciar()
+        servicio = ServicioNormalizacion(agrupador, metricas)
+        servidor = await asyncio.start_server(servicio.atender, host, port)
+        print(f"Servicio de normalización en http://{host}:{port} ({workers} procesos)", flush=True)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await agrupador.detener()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP de normalización de direcciones")
+    parser.add_argument("--host", default="127.0.0.1", help="interfaz (por defecto 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="puerto (por defecto 8080)")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="procesos para normalizar (0 = todos los núcleos, por defecto 0)")
+    parser.add_argument("--batch-size", type=int, default=TAMANO_LOTE_SERVICIO,
+                        help=f"máximo de direcciones por lote (por defecto {TAMANO_LOTE_SERVICIO})")
+    parser.add_argument("--max-wait-ms", type=float, default=ESPERA_MAXIMA * 1000,
+                        help=f"espera máxima para completar un lote en ms (por defecto {ESPERA_MAXIMA * 1000:g})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.port, args.workers, args.batch_size, args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()